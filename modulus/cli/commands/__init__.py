@@ -1,7 +1,9 @@
 from .apply import apply
+from .batch import batch
+from .bench import bench
 from .destroy import destroy
 from .init import init
 from .plan import plan
 from .run import run
 from .show import show
-from .verify import verify
\ No newline at end of file
+from .verify import verify
@@ -0,0 +1,21 @@
+from modulus.core.parser import TomlParser
+from modulus.core.resources.batch import BatchRunner
+from modulus.cli.commands.run import CONFIG_FILE, build_tasks
+
+
+def batch(task_name: str, input_path: str, output_path: str, concurrency: int = 8,
+          provider_batch: bool = False, batch_size: int = 10000, poll_interval: float = 30.0):
+    parser = TomlParser()
+    config_data = parser.parse(CONFIG_FILE)
+
+    tasks = build_tasks(config_data)
+    task_name = task_name.removeprefix("task.")
+    if task_name not in tasks:
+        raise ValueError(f"Task `{task_name}` is not defined")
+
+    runner = BatchRunner(tasks[task_name], concurrency, provider_batch, batch_size, poll_interval)
+
+    print(f"[modulus] Running batch: {task_name} {input_path} -> {output_path}")
+    counts = runner.run_file(input_path, output_path)
+    print(f"[modulus] {counts['succeeded']} succeeded, {counts['failed']} failed, "
+          f"{counts['skipped']} already done")
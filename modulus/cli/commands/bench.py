@@ -0,0 +1,127 @@
+import asyncio
+import json
+import time
+
+from typing import Optional
+
+import httpx
+
+from modulus.core.parser import TomlParser
+from modulus.core.stages import parse_server_timing
+from modulus.core.tracing import configure_tracing
+from modulus.cli.commands.run import CONFIG_FILE, build_deployments, build_exporter, load_prompt
+
+
+def percentile(values: list[float], p: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(p / 100 * (len(values) - 1))))]
+
+
+async def drive(client: httpx.AsyncClient, path: str, payload, requests: Optional[int], concurrency: int,
+                qps: float = None, duration: float = None) -> dict:
+    """
+    Send `requests` POSTs (or as many as fit in `duration` seconds) with at most `concurrency`
+    in flight. With `qps`, request starts are paced at that rate; otherwise each worker sends
+    its next request as soon as the previous one finishes.
+    """
+    results = {"latencies": [], "errors": 0, "stages": {}}
+    started = time.perf_counter()
+    next_index = 0
+
+    def claim():
+        nonlocal next_index
+        if requests is not None and next_index >= requests:
+            return None
+        if duration is not None:
+            # Paced requests are claimed ahead of their start time, so compare the scheduled start
+            scheduled = next_index / qps if qps else time.perf_counter() - started
+            if scheduled >= duration:
+                return None
+        next_index += 1
+        return next_index - 1
+
+    async def worker():
+        while (index := claim()) is not None:
+            if qps:
+                await asyncio.sleep(max(0.0, started + index / qps - time.perf_counter()))
+
+            sent = time.perf_counter()
+            try:
+                response = await client.post(path, json=payload)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                response, failed = None, True
+
+            if failed:
+                results["errors"] += 1
+                continue
+
+            results["latencies"].append(time.perf_counter() - sent)
+            for name, seconds in parse_server_timing(response.headers.get("server-timing", "")).items():
+                results["stages"].setdefault(name, []).append(seconds)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    results["elapsed"] = time.perf_counter() - started
+    return results
+
+
+def report(task_name: str, results: dict):
+    latencies = results["latencies"]
+    completed = len(latencies)
+    elapsed = results["elapsed"]
+
+    print(f"[modulus] Benchmark: {task_name}")
+    print(f"requests      {completed + results['errors']} ({results['errors']} errors) in {elapsed:.2f}s")
+    print(f"throughput    {completed / elapsed if elapsed else 0.0:.1f} req/s")
+    print(f"latency (ms)  p50 {percentile(latencies, 50) * 1000:.1f}  p95 {percentile(latencies, 95) * 1000:.1f}  "
+          f"p99 {percentile(latencies, 99) * 1000:.1f}  max {max(latencies, default=0.0) * 1000:.1f}")
+
+    if results["stages"]:
+        # agent includes llm; stages of concurrent agents add up
+        print("stage (ms)    mean      p95")
+        for name, values in results["stages"].items():
+            print(f"  {name:<10}  {sum(values) / len(values) * 1000:8.2f}  {percentile(values, 95) * 1000:8.2f}")
+
+
+def bench(task_name: str, input_data: str, deployment_name: str = "default", url: str = None,
+          requests: int = None, concurrency: int = 8, qps: float = None, duration: float = None,
+          warmup: int = 5):
+    if requests is None and duration is None:
+        requests = 200
+
+    payload = json.loads(load_prompt(input_data))
+    task_name = task_name.removeprefix("task.")
+
+    if url is not None:
+        transport, base_url = None, url
+    else:
+        # Serve the deployment's app in-process: the numbers cover modulus itself, not the network
+        parser = TomlParser()
+        config_data = parser.parse(CONFIG_FILE)
+
+        deployments = build_deployments(config_data)
+        if deployment_name not in deployments:
+            raise ValueError(f"Deployment `{deployment_name}` is not defined")
+
+        deployment = deployments[deployment_name]
+        if task_name not in [task.name for task in deployment.expose]:
+            raise ValueError(f"Deployment `{deployment_name}` does not expose task `{task_name}`")
+
+        # Tracing follows the deployment config, so its overhead can be benchmarked too
+        configure_tracing(build_exporter(deployment.options))
+
+        # Unhandled errors become 500 responses, as they would behind a server
+        transport = httpx.ASGITransport(app=deployment.runtime.build_app(deployment.expose),
+                                        raise_app_exceptions=False)
+        base_url = "http://modulus"
+
+    async def main():
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(transport=transport, base_url=base_url, limits=limits, timeout=None) as client:
+            if warmup:
+                await drive(client, f"/{task_name}", payload, warmup, min(concurrency, warmup))
+            return await drive(client, f"/{task_name}", payload, requests, concurrency, qps, duration)
+
+    report(task_name, asyncio.run(main()))
@@ -40,10 +40,10 @@ model = "text-embedding-ada-002"
 # Defines vector memory store
 # ----------------------------
 [memory.vectorstore]
-type = "chroma"
+type = "local"
 persist = true
 namespace = "main"
-embedding_model = "text-embedding-ada-002"
+embedding = "ada"
 
 # ----------------------------
 # [[tool]]
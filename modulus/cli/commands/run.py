@@ -1,22 +1,41 @@
 import os
-import importlib
-import importlib.util
 import inspect
+import shutil
 
-from typing import Callable
+from typing import Callable, Optional
 
 from modulus.core.parser import TomlParser
-from modulus.core.resources.provider import OpenAIProvider, AnthropicProvider
+from modulus.core.util import load_function, resolve_value
+from modulus.core.resources.provider import OpenAIProvider, AnthropicProvider, MockProvider
 from modulus.core.resources.agent import Agent
-from modulus.core.resources.llm import OpenAILLM, AnthropicLLM
+from modulus.core.resources.llm import OpenAILLM, AnthropicLLM, MockLLM, CachedLLM, ResilientLLM, RouterLLM
+from modulus.core.resources.cache import Cache, MemoryCache, DiskCache
 from modulus.core.resources.task import Task
-from modulus.core.resources.tool import Function
+from modulus.core.resources.single_flight import SingleFlight
+from modulus.core.resources.tool import Function, CachedTool, VectorLookup, ApiEndpoint
+from modulus.core.resources.api_client import ApiClient, CircuitBreaker
+from modulus.core.resources.process_pool import ToolProcessPool
 from modulus.core.resources.deployment import Deployment
 from modulus.core.resources.runtime.fastapi_runtime import FastAPIRuntime
-from modulus.core.resources.embedding import OpenAIEmbeddingModel
+from modulus.core.resources.embedding import OpenAIEmbeddingModel, CachedEmbeddingModel
+from modulus.core.resources.memory import LocalMemory, PersistentMemory, VectorIndex, FlatIndex, IVFIndex
+from modulus.core.metrics import REGISTRY, enable_multiprocess
+from modulus.core.tracing import SpanExporter, ConsoleExporter, FileExporter, OTLPExporter, configure_tracing
 
 STATE_FILE = ".modulus.state.toml"
 CONFIG_FILE = "modulus.toml"
+CACHE_DIR = os.path.join(".modulus", "cache")
+MEMORY_DIR = os.path.join(".modulus", "memory")
+TRACE_FILE = os.path.join(".modulus", "traces.jsonl")
+METRICS_DIR = os.path.join(".modulus", "metrics")
+
+CONFIG_ENV = "MODULUS_CONFIG"
+DEPLOYMENT_ENV = "MODULUS_DEPLOYMENT"
+METRICS_ENV = "MODULUS_METRICS_DIR"
+APP_FACTORY = "modulus.cli.commands.run:create_app"
+
+CACHE_OPTIONS = {"cache", "cache_ttl", "cache_max_entries", "cache_path", "cache_deterministic_only"}
+RETRY_OPTIONS = {"retries", "retry_backoff", "retry_backoff_max", "attempt_timeout", "hedge", "hedge_delay"}
 
 
 def load_prompt(value: str) -> str:
@@ -29,39 +48,6 @@ def load_prompt(value: str) -> str:
     return value
 
 
-def load_function(function_path: str):
-    """
-    Load a function given a path like 'functions/foo.foofn' relative to current working directory,
-    without requiring the directory to be in sys.path or a package.
-
-    - Splits to get module file path and function name.
-    - Loads module from file.
-    - Returns the function object.
-    """
-    # Separate the module path and function name
-    module_path_str, fn_name = function_path.rsplit('.', 1)
-    # Convert dots or slashes to filesystem path
-    module_path_parts = module_path_str.replace('.', '/').split('/')
-    # Build the .py file path relative to current working directory
-    module_file_path = os.path.join(*module_path_parts) + ".py"
-
-    if not os.path.isfile(module_file_path):
-        raise FileNotFoundError(f"Module file not found at: {module_file_path}")
-
-    # Create a unique module name for importlib
-    module_name = "_modulus_dynamic_module"
-
-    spec = importlib.util.spec_from_file_location(module_name, module_file_path)
-    module = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(module)  # Load the module
-
-    fn = getattr(module, fn_name, None)
-    if fn is None:
-        raise AttributeError(f"Function '{fn_name}' not found in module '{module_file_path}'")
-
-    return fn
-
-
 def get_function_signature(fn: Callable) -> str:
     """
     Return a string representation of the function's signature.
@@ -70,25 +56,155 @@ def get_function_signature(fn: Callable) -> str:
     return str(signature)
 
 
-def run():
-    parser = TomlParser()
-    config_data = parser.parse(CONFIG_FILE)
+def split_options(params: dict, keys: set) -> tuple[dict, dict]:
+    """
+    Separate wrapper options (e.g. CACHE_OPTIONS) of a resource block from the params forwarded to the resource.
+    """
+    options = {k: v for k, v in params.items() if k in keys}
+    params = {k: v for k, v in params.items() if k not in keys}
+    return params, options
+
+
+def build_cache(name: str, cache_options: dict) -> Cache:
+    """
+    Build the cache backend described by `cache = "memory"|"disk"` and its `cache_*` options.
+    `name` identifies the owning resource and names the on-disk file by default.
+    """
+    kind = cache_options.get("cache")
+    ttl = cache_options.get("cache_ttl")
+    max_entries = cache_options.get("cache_max_entries")
+
+    if kind == "memory":
+        cache = MemoryCache(max_entries or 1024, ttl)
+    elif kind == "disk":
+        path = cache_options.get("cache_path", os.path.join(CACHE_DIR, f"{name}.sqlite"))
+        cache = DiskCache(path, max_entries, ttl)
+    else:
+        raise NotImplementedError(f"Cache type {kind} for {name} is currently not supported")
+
+    REGISTRY.register_collector(lambda: [
+        ("modulus_cache_requests_total", "counter", "Cache lookups by result",
+         [[{"cache": name, "result": "hit"}, cache.hits], [{"cache": name, "result": "miss"}, cache.misses]]),
+    ])
+    return cache
+
+
+def register_metrics(providers: dict, llms: dict, tools: dict, tasks: dict):
+    """
+    Expose the counters resources already keep (rate limiters, token usage, retries, tool caches,
+    coalescing) as metrics read at scrape time.
+    """
+    def collect():
+        admitted, delayed, in_flight = [], [], []
+        for name, provider in providers.items():
+            stats = provider.limiter.stats()
+            admitted.append([{"provider": name}, stats["admitted"]])
+            delayed.append([{"provider": name}, stats["delayed"]])
+            in_flight.append([{"provider": name}, stats["in_flight"]])
+
+        tokens, resilience = [], []
+        for name, llm in llms.items():
+            # Routers sum their backends, which are listed themselves
+            if isinstance(llm, RouterLLM):
+                continue
+            model = llm.get_model()
+            for kind, value in llm.usage_stats().items():
+                tokens.append([{"llm": name, "model": model, "type": kind.removesuffix("_tokens")}, value])
+
+            resilient = llm.llm if isinstance(llm, CachedLLM) else llm
+            if isinstance(resilient, ResilientLLM):
+                for event, value in resilient.stats().items():
+                    resilience.append([{"llm": name, "event": event}, value])
+
+        tool_cache, api_requests, circuits = [], [], []
+        for name, tool in tools.items():
+            if isinstance(tool, CachedTool):
+                stats = tool.stats()
+                tool_cache.append([{"tool": name, "result": "hit"}, stats["hits"]])
+                tool_cache.append([{"tool": name, "result": "miss"}, stats["misses"]])
+                tool = tool.tool
+
+            if isinstance(tool, ApiEndpoint):
+                for outcome, value in tool.stats().items():
+                    api_requests.append([{"tool": name, "result": outcome}, value])
+                circuits.append([{"tool": name}, int(tool.breaker.state != "closed")])
+
+        coalesced = [[{"task": name}, task.coalesce.stats()["coalesced"]]
+                     for name, task in tasks.items() if task.coalesce is not None]
+
+        return [
+            ("modulus_provider_requests_admitted_total", "counter", "Requests admitted by provider rate limits",
+             admitted),
+            ("modulus_provider_requests_delayed_total", "counter", "Requests delayed by provider rate limits",
+             delayed),
+            ("modulus_provider_in_flight", "gauge", "Provider requests in flight", in_flight),
+            ("modulus_llm_tokens_total", "counter", "LLM tokens by type", tokens),
+            ("modulus_llm_resilience_events_total", "counter", "LLM calls, attempts, retries and hedges",
+             resilience),
+            ("modulus_tool_cache_requests_total", "counter", "Tool calls served from (hit) or added to (miss) "
+             "the tool's result cache", tool_cache),
+            ("modulus_api_tool_requests_total", "counter", "API tool requests by result (ok, not_modified, failed, "
+             "rejected by the circuit breaker)", api_requests),
+            ("modulus_api_tool_circuit_open", "gauge", "Whether the API tool's circuit breaker is open", circuits),
+            ("modulus_coalesced_requests_total", "counter", "Task requests served by another identical request",
+             coalesced),
+        ]
+
+    REGISTRY.register_collector(collect)
+
+
+def build_index(memory_name: str, params: dict) -> VectorIndex:
+    index_type = params.get('index', 'flat')
+
+    if index_type == 'flat':
+        return FlatIndex()
+    elif index_type == 'ivf':
+        return IVFIndex(params.get('nlist', 256), params.get('nprobe', 8), params.get('train_size'))
+    else:
+        raise NotImplementedError(f"Memory {memory_name} index type {index_type} is not supported")
+
+
+def build_exporter(options: dict) -> Optional[SpanExporter]:
+    """
+    Span exporter selected by a deployment's `tracing` option: true or "file" (JSON lines in
+    `tracing_path`), "console", or "otlp" (`otlp_endpoint`, `service_name`). None disables tracing.
+    """
+    kind = options.get("tracing")
+    if kind is True:
+        kind = "file"
+
+    if not kind:
+        return None
+    elif kind == "file":
+        return FileExporter(options.get("tracing_path", TRACE_FILE))
+    elif kind == "console":
+        return ConsoleExporter()
+    elif kind == "otlp":
+        return OTLPExporter(options.get("otlp_endpoint", "http://localhost:4318"),
+                            options.get("service_name", "modulus"))
+    else:
+        raise NotImplementedError(f"Tracing exporter {kind} is not supported")
+
+
+def build_tasks(config_data: dict) -> dict[str, Task]:
+    """
+    Construct the resource graph described by a parsed config and return its tasks.
+    """
+    # Collectors read the resources they were registered with, so a rebuilt graph replaces them all
+    REGISTRY.clear_collectors()
 
     providers = {}
     for provider_name in config_data.get('provider'):
         provider = config_data.get('provider').get(provider_name)
 
-        api_key = provider.api_key
-        if provider.api_key and provider.api_key.startswith("@var:"):
-            api_key_name = provider.api_key[len("@var:"):]
-            api_key = config_data.get('vars').get('vars').values.get(api_key_name, None)
-        elif provider.api_key and provider.api_key.startswith("@env:"):
-            api_key = os.environ.get(provider.api_key[len('@env:')], None)
+        api_key = resolve_value(provider.api_key, config_data)
 
         if provider.type == 'openai':
             providers[provider_name] = OpenAIProvider(api_key, provider.params)
         elif provider.type == 'anthropic':
             providers[provider_name] = AnthropicProvider(api_key, provider.params)
+        elif provider.type == 'mock':
+            providers[provider_name] = MockProvider(provider.params)
         else:
             raise NotImplementedError(f"Provider type {provider.type} is currently not supported")
 
@@ -96,40 +212,159 @@ def run():
     for llm_name in config_data.get('llm'):
         llm = config_data.get('llm').get(llm_name)
 
+        # Routers are built once the LLMs they route to exist
+        if llm.routes is not None:
+            continue
+
         provider = providers.get(llm.provider)
 
         main_params = {
             'temperature': llm.temperature, 'max_tokens': llm.max_tokens
         }
+        llm_params, cache_options = split_options(llm.params, CACHE_OPTIONS)
+        llm_params, retry_options = split_options(llm_params, RETRY_OPTIONS)
 
         if type(provider) == OpenAIProvider:
-            llms[llm_name] = OpenAILLM(provider, llm.model, main_params | llm.params)
+            llms[llm_name] = OpenAILLM(provider, llm.model, main_params | llm_params)
         elif type(provider) == AnthropicProvider:
-            llms[llm_name] = AnthropicLLM(provider, llm.model, main_params | llm.params)
+            llms[llm_name] = AnthropicLLM(provider, llm.model, main_params | llm_params)
+        elif type(provider) == MockProvider:
+            llms[llm_name] = MockLLM(provider, llm.model, main_params | llm_params)
         else:
             raise NotImplementedError(f"LLM {llm_name} requires provider that is not implemented")
 
+        if retry_options:
+            llms[llm_name] = ResilientLLM(
+                llms[llm_name],
+                retries=retry_options.get("retries", 2),
+                backoff=retry_options.get("retry_backoff", 0.5),
+                backoff_max=retry_options.get("retry_backoff_max", 30.0),
+                attempt_timeout=retry_options.get("attempt_timeout"),
+                hedge=retry_options.get("hedge", False),
+                hedge_delay=retry_options.get("hedge_delay"),
+            )
+
+        # Sampled outputs can be excluded from caching with `cache_deterministic_only = true`
+        sampling = llm.temperature is not None and llm.temperature > 0
+        if cache_options.get("cache") and not (cache_options.get("cache_deterministic_only") and sampling):
+            llms[llm_name] = CachedLLM(llms[llm_name], build_cache(f"llm-{llm_name}", cache_options))
+
+    for llm_name in config_data.get('llm'):
+        llm = config_data.get('llm').get(llm_name)
+
+        if llm.routes is None:
+            continue
+
+        for route in llm.routes:
+            if route not in llms:
+                raise ValueError(f"LLM router {llm_name} routes to unknown or router LLM `{route}`")
+
+        llms[llm_name] = RouterLLM(
+            [llms[route] for route in llm.routes],
+            llm.routes,
+            policy=llm.params.get("policy", "fallback"),
+            weights=llm.params.get("weights"),
+            failure_threshold=llm.params.get("failure_threshold", 3),
+            cooldown=llm.params.get("cooldown", 30.0),
+        )
+
     embeddings = {}
-    for embedding_name in config_data.get('embedding'):
+    for embedding_name in config_data.get('embedding', {}):
         embedding = config_data.get('embedding').get(embedding_name)
 
         provider = providers.get(embedding.provider)
         embeddings[embedding_name] = OpenAIEmbeddingModel(provider, embedding.model)
 
+        _, cache_options = split_options(embedding.params, CACHE_OPTIONS)
+        if cache_options.get("cache"):
+            # Disk caches still get an in-memory tier in front for hot texts
+            caches = [build_cache(f"embedding-{embedding_name}", cache_options)]
+            if cache_options["cache"] == "disk":
+                caches.insert(0, MemoryCache(4096, cache_options.get("cache_ttl")))
+            embeddings[embedding_name] = CachedEmbeddingModel(embeddings[embedding_name], caches)
+
+    memories = {}
+    for memory_name in config_data.get('memory', {}):
+        memory_config = config_data.get('memory').get(memory_name)
+
+        embedder = embeddings.get(memory_config.embedding)
+        index = build_index(memory_name, memory_config.params)
+
+        if memory_config.type == 'local':
+            if memory_config.persist:
+                namespace = memory_config.namespace or memory_name
+                path = memory_config.params.get('path', os.path.join(MEMORY_DIR, namespace))
+                memories[memory_name] = PersistentMemory(embedder, path, index=index)
+            else:
+                memories[memory_name] = LocalMemory(embedder, index=index)
+        else:
+            raise NotImplementedError(f"Memory {memory_name} of type {memory_config.type} is not supported")
+
+    # Function tools with `executor = "process"` share one worker pool that preloads all of them
+    process_tools = [tool_config for tool_config in config_data.get('tool', {}).values()
+                     if tool_config.type == 'function' and tool_config.params.get('executor') == 'process']
+    tool_pool = None
+    if process_tools:
+        tool_pool = ToolProcessPool([tool_config.params.get('function') for tool_config in process_tools],
+                                    max(tool_config.params.get('workers') or 0 for tool_config in process_tools) or None)
+
+    # API tools share one set of connection pools, sized by the largest `max_connections`
+    api_tools = [tool_config for tool_config in config_data.get('tool', {}).values() if tool_config.type == 'api']
+    api_client = None
+    if api_tools:
+        api_client = ApiClient({
+            'max_connections': max(tool_config.params.get('max_connections', 100) for tool_config in api_tools),
+        })
+
     tools = {}
-    for tool_name in config_data.get('tool'):
+    for tool_name in config_data.get('tool', {}):
         tool_config = config_data.get('tool').get(tool_name)
+        _, cache_options = split_options(tool_config.params, CACHE_OPTIONS)
 
         if tool_config.type == 'function':
             function = tool_config.params.get('function')
             if function.startswith('@builtin:'):
                 raise NotImplementedError(f"Tool {tool_name} calling builtin functions, not implemented")
             else:
-                fn = load_function("functions/foo.foofn")
-                tools[tool_name] = Function(tool_name, fn)
+                tools[tool_name] = Function(tool_name, load_function(function),
+                                            executor=tool_config.params.get('executor', 'thread'),
+                                            timeout=tool_config.params.get('timeout'),
+                                            memory_limit_mb=tool_config.params.get('memory_limit_mb'),
+                                            pool=tool_pool, function_path=function)
+        elif tool_config.type == 'vector_lookup':
+            tools[tool_name] = VectorLookup(tool_name, memories[tool_config.params.get('memory')],
+                                            description=tool_config.params.get('description'),
+                                            k=tool_config.params.get('k', 5),
+                                            min_score=tool_config.params.get('min_score'),
+                                            filters=tool_config.params.get('filters'))
+        elif tool_config.type == 'api':
+            headers = {header: resolve_value(value, config_data)
+                       for header, value in tool_config.params.get('headers', {}).items()}
+            for header, value in headers.items():
+                if value is None:
+                    raise ValueError(f"Tool {tool_name} header {header} references an undefined variable")
+            tools[tool_name] = ApiEndpoint(tool_name, tool_config.params.get('url'), api_client,
+                                           method=tool_config.params.get('method', 'GET'),
+                                           headers=headers,
+                                           timeout=tool_config.params.get('timeout'),
+                                           parameters=tool_config.params.get('parameters'),
+                                           description=tool_config.params.get('description'),
+                                           fan_out=tool_config.params.get('fan_out'),
+                                           breaker=CircuitBreaker(tool_config.params.get('failure_threshold', 5),
+                                                                  tool_config.params.get('cooldown', 30.0)),
+                                           conditional_cache_size=tool_config.params.get('conditional_cache_size',
+                                                                                         1024))
         else:
             raise NotImplementedError(f"Tool {tool_name} of type {tool_config.type} is not supported")
 
+        # Deterministic tools can memoize their results with `cache = "memory"|"disk"`
+        if cache_options.get("cache"):
+            caches = [build_cache(f"tool-{tool_name}", cache_options)]
+            if cache_options["cache"] == "disk":
+                caches.insert(0, MemoryCache(cache_options.get("cache_max_entries") or 1024,
+                                             cache_options.get("cache_ttl")))
+            tools[tool_name] = CachedTool(tools[tool_name], caches)
+
     agents = {}
     for agent_name in config_data.get('agent'):
         agent_config = config_data.get('agent').get(agent_name)
@@ -144,7 +379,14 @@ def run():
             with open(filename, 'r') as file:
                 prompt = file.read()
 
-        agents[agent_config.name] = Agent(agent_config.name, llm, prompt)
+        # With `rag = true`, every message is augmented with passages retrieved from the agent's memory
+        rag_memory = memories[agent_config.memory] if agent_config.params.get('rag') else None
+
+        agent_tools = {tool_name: tools[tool_name] for tool_name in agent_config.tools}
+        agents[agent_config.name] = Agent(agent_config.name, llm, prompt, agent_tools,
+                                          agent_config.params.get('max_iter', 5), memory=rag_memory,
+                                          rag_k=agent_config.params.get('rag_k', 5),
+                                          rag_min_score=agent_config.params.get('rag_min_score'))
 
     tasks = {}
     for task_name in config_data.get('task'):
@@ -154,8 +396,26 @@ def run():
 
         flow = [agents[agent_name] for agent_name in task_agents_names]
 
+        # `coalesce = true` shares one flow execution between concurrent identical inputs
+        coalesce, coalesce_key = None, None
+        if task_config.params.get('coalesce'):
+            coalesce = SingleFlight(task_config.params.get('coalesce_max_waiters'))
+            if task_config.params.get('coalesce_key'):
+                coalesce_key = load_function(task_config.params.get('coalesce_key'))
+
         tasks[task_name] = Task(task_name, flow, task_config.input_schema, task_config.output_schema,
-                                task_config.output_intermediate)
+                                task_config.output_intermediate, task_config.depends_on,
+                                coalesce, coalesce_key)
+
+    register_metrics(providers, llms, tools, tasks)
+    return tasks
+
+
+def build_deployments(config_data: dict) -> dict[str, Deployment]:
+    """
+    Construct the full resource graph described by a parsed config and return its deployments.
+    """
+    tasks = build_tasks(config_data)
 
     deployments = {}
     for deployment_name in config_data.get('deployment'):
@@ -164,17 +424,58 @@ def run():
         expose = [tasks[task_name[len("task."):]] for task_name in deployment_config.expose]
 
         if deployment_config.runtime == 'fastapi':
-            runtime = FastAPIRuntime()
+            runtime = FastAPIRuntime(app_factory=APP_FACTORY,
+                                     batch_concurrency=deployment_config.params.get('batch_concurrency', 8),
+                                     metrics=deployment_config.params.get('metrics', True))
         else:
             raise NotImplementedError(f"Unsupported deployment runtime `{deployment_config.runtime}`")
 
-        deployments[deployment_name] = Deployment(deployment_name, expose, deployment_config.port, runtime)
+        deployments[deployment_name] = Deployment(deployment_name, expose, deployment_config.port, runtime,
+                                                  deployment_config.host, deployment_config.workers,
+                                                  deployment_config.params)
+
+    return deployments
 
-    deployments['default'].start()
 
-    import time
-    try:
-        while True:
-            time.sleep(1)
-    except KeyboardInterrupt:
-        print("Shutting down...")
\ No newline at end of file
+def create_app():
+    """
+    App factory used by multi-worker servers: each worker process imports this and builds its own
+    resource graph from the config and deployment selected by `run` through the environment.
+    """
+    parser = TomlParser()
+    config_data = parser.parse(os.environ.get(CONFIG_ENV, CONFIG_FILE))
+
+    deployment = build_deployments(config_data)[os.environ.get(DEPLOYMENT_ENV, "default")]
+    configure_tracing(build_exporter(deployment.options))
+    if os.environ.get(METRICS_ENV):
+        # Any worker can serve a scrape, so each shares its metrics with the others
+        enable_multiprocess(os.environ[METRICS_ENV])
+    return deployment.runtime.build_app(deployment.expose)
+
+
+def run(deployment_name: str = "default"):
+    parser = TomlParser()
+    config_data = parser.parse(CONFIG_FILE)
+
+    deployments = build_deployments(config_data)
+    if deployment_name not in deployments:
+        raise ValueError(f"Deployment `{deployment_name}` is not defined")
+
+    # Inherited by worker processes so create_app builds the same deployment
+    os.environ[CONFIG_ENV] = os.path.abspath(CONFIG_FILE)
+    os.environ[DEPLOYMENT_ENV] = deployment_name
+
+    # Workers configure their own exporter in create_app
+    if deployments[deployment_name].workers <= 1:
+        configure_tracing(build_exporter(deployments[deployment_name].options))
+    else:
+        # Snapshots left by a previous run would be merged into this one's totals
+        metrics_dir = os.path.abspath(os.path.join(METRICS_DIR, deployment_name))
+        shutil.rmtree(metrics_dir, ignore_errors=True)
+        os.makedirs(metrics_dir)
+        os.environ[METRICS_ENV] = metrics_dir
+
+    # Blocks until the server receives SIGINT/SIGTERM and drains in-flight requests
+    deployments[deployment_name].start()
+    configure_tracing(None)
+    print("Shutting down...")
@@ -1,20 +1,37 @@
 import os
+import string
 
 from modulus.core.parser import TomlParser
+from modulus.core.util import find_cycle, resolve_value
 
 
 def verify_provider(resources, config):
     for resource, params in resources.items():
         # TODO: verify api_key exists if specified
-        if params.type == 'openai':
+        if params.type in ['openai', 'anthropic']:
             continue
+        elif params.type == 'mock':
+            distribution = params.params.get('latency_distribution', 'lognormal')
+            if distribution not in ['fixed', 'normal', 'lognormal']:
+                print(f"Provider `{resource}` has unsupported latency_distribution `{distribution}`")
+                return False
         else:
-            print(f"Provider `{params.provider}` support coming soon")
+            print(f"Provider `{params.type}` support coming soon")
             return False
 
     return True
 
 
+def verify_cache(resource_name, params):
+    cache = params.get("cache")
+
+    if cache is not None and cache not in ["memory", "disk"]:
+        print(f"'{resource_name}' references unavailable cache type '{cache}'")
+        return False
+
+    return True
+
+
 def verify_llm(resources, config):
     for resource_name in resources:
         resource = resources.get(resource_name)
@@ -26,6 +43,30 @@ def verify_llm(resources, config):
                 print(f"LLM '{resource_name}' references non-existent provider '{provider}'")
                 return False
 
+        if not verify_cache(resource_name, resource.params):
+            return False
+
+        if resource.routes is not None:
+            if not resource.routes:
+                print(f"LLM '{resource_name}' must route to at least one LLM")
+                return False
+
+            for route in resource.routes:
+                target = config.get("llm").get(route)
+                if target is None or target.routes is not None:
+                    print(f"LLM '{resource_name}' routes to non-existent or router LLM '{route}'")
+                    return False
+
+            policy = resource.params.get("policy", "fallback")
+            if policy not in ["fallback", "latency", "weighted"]:
+                print(f"LLM '{resource_name}' references unavailable routing policy '{policy}'")
+                return False
+
+            weights = resource.params.get("weights")
+            if weights is not None and len(weights) != len(resource.routes):
+                print(f"LLM '{resource_name}' must have one weight per route")
+                return False
+
     return True
 
 
@@ -40,6 +81,9 @@ def verify_embedding(resources, config):
                 print(f"Embedding '{resource_name}' references non-existent provider '{provider}'")
                 return False
 
+        if not verify_cache(resource_name, resource.params):
+            return False
+
     return True
 
 
@@ -57,6 +101,12 @@ def verify_memory(resources, config):
                 print(f"Memory '{resource_name}' references non-existent embedding '{embedding}'")
                 return False
 
+        index = resource.params.get("index", "flat")
+
+        if index not in ["flat", "ivf"]:
+            print(f"Memory '{resource_name}' references unavailable index type '{index}'")
+            return False
+
     return True
 
 def verify_tool(resources, config):
@@ -70,13 +120,89 @@ def verify_tool(resources, config):
             print(f"Tool '{resource_name}' references unavailable type '{resource.type}'")
             return False
 
+        if not verify_cache(resource_name, resource.params):
+            return False
+
+        executor = resource.params.get("executor", "thread")
+        if executor not in ["inline", "thread", "process"]:
+            print(f"Tool '{resource_name}' references unavailable executor '{executor}'")
+            return False
+
+        if resource.params.get("memory_limit_mb") is not None and executor != "process":
+            print(f"Tool '{resource_name}' memory_limit_mb requires executor = \"process\"")
+            return False
+
+        for option in ["timeout", "memory_limit_mb", "workers"]:
+            value = resource.params.get(option)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0):
+                print(f"Tool '{resource_name}' {option} must be a positive number")
+                return False
+
         memory = resource.params.get("memory")
 
         if memory is not None:
-            if config.get("memory").get(memory) is None:
+            if config.get("memory", {}).get(memory) is None:
                 print(f"Tool '{resource_name}' references non-existent memory '{memory}'")
                 return False
 
+        if resource.type == "api":
+            url = resource.params.get("url")
+            if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+                print(f"Tool '{resource_name}' of type api requires an http(s) url")
+                return False
+
+            method = resource.params.get("method", "GET")
+            if not isinstance(method, str) or method.upper() not in ["GET", "POST", "PUT", "PATCH", "DELETE"]:
+                print(f"Tool '{resource_name}' references unavailable method '{method}'")
+                return False
+
+            parameters = resource.params.get("parameters", {})
+            if not isinstance(parameters, dict):
+                print(f"Tool '{resource_name}' parameters must be a table of argument types")
+                return False
+
+            try:
+                placeholders = [field for _, field, _, _ in string.Formatter().parse(url) if field]
+            except ValueError as e:
+                print(f"Tool '{resource_name}' has an invalid url template: {e}")
+                return False
+
+            fan_out = resource.params.get("fan_out")
+            if fan_out is not None and fan_out not in placeholders and fan_out not in parameters:
+                print(f"Tool '{resource_name}' fans out over unknown argument '{fan_out}'")
+                return False
+
+            headers = resource.params.get("headers", {})
+            if not isinstance(headers, dict):
+                print(f"Tool '{resource_name}' headers must be a table of header values")
+                return False
+
+            for header, value in headers.items():
+                if resolve_value(value, config) is None:
+                    print(f"Tool '{resource_name}' header '{header}' references undefined '{value}'")
+                    return False
+
+            for option in ["failure_threshold", "cooldown", "max_connections"]:
+                value = resource.params.get(option)
+                if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0):
+                    print(f"Tool '{resource_name}' {option} must be a positive number")
+                    return False
+
+        if resource.type == "vector_lookup":
+            if memory is None:
+                print(f"Tool '{resource_name}' of type vector_lookup requires a memory")
+                return False
+
+            k = resource.params.get("k", 5)
+            if isinstance(k, bool) or not isinstance(k, int) or k < 1:
+                print(f"Tool '{resource_name}' k must be a positive integer")
+                return False
+
+            filters = resource.params.get("filters")
+            if filters is not None and not isinstance(filters, dict):
+                print(f"Tool '{resource_name}' filters must be a table of metadata values")
+                return False
+
     return True
 
 
@@ -103,16 +229,31 @@ def verify_agent(resources, config):
         tools = resource.tools
 
         for tool in tools:
-            if config.get("tool").get(tool) is None:
+            if config.get("tool", {}).get(tool) is None:
                 print(f"Agent '{resource_name}' references non-existent tool '{tool}'")
                 return False
 
+        max_iter = resource.params.get("max_iter", 5)
+        if not isinstance(max_iter, int) or max_iter < 1:
+            print(f"Agent '{resource_name}' max_iter must be a positive integer")
+            return False
+
         memory = resource.memory
 
-        if config.get("memory").get(memory) is None:
+        if memory is not None and config.get("memory", {}).get(memory) is None:
             print(f"Agent '{resource_name}' references non-existent memory '{memory}'")
             return False
 
+        if resource.params.get("rag"):
+            if memory is None:
+                print(f"Agent '{resource_name}' uses rag, which requires a memory")
+                return False
+
+            rag_k = resource.params.get("rag_k", 5)
+            if isinstance(rag_k, bool) or not isinstance(rag_k, int) or rag_k < 1:
+                print(f"Agent '{resource_name}' rag_k must be a positive integer")
+                return False
+
         prompt = resource.prompt
         if not verify_prompt(prompt):
             print(f"Agent '{resource_name}' has invalid prompt: {prompt}")
@@ -135,6 +276,48 @@ def verify_task(resources, config):
                 print(f"Task '{resource_name}' references non-existent agent '{agent}'")
                 return False
 
+        depends_on = resource.depends_on
+
+        if depends_on is not None:
+            if len(set(flow)) != len(flow):
+                print(f"Task '{resource_name}' uses depends_on, so its flow cannot repeat agents")
+                return False
+
+            for agent, upstream in depends_on.items():
+                if not isinstance(upstream, list) or not all(isinstance(name, str) for name in upstream):
+                    print(f"Task '{resource_name}' depends_on '{agent}' must be a list of agent names")
+                    return False
+
+                for name in [agent, *upstream]:
+                    if name not in flow:
+                        print(f"Task '{resource_name}' depends_on references agent '{name}' not in its flow")
+                        return False
+
+            cycle = find_cycle({agent: list(upstream) for agent, upstream in depends_on.items()})
+            if cycle:
+                print(f"Task '{resource_name}' has a dependency cycle: {' -> '.join(cycle)}")
+                return False
+
+            if any(flow[-1] in upstream for upstream in depends_on.values()):
+                print(f"Task '{resource_name}' final agent '{flow[-1]}' cannot be a dependency of other agents")
+                return False
+
+            # Only the final agent's output is returned, so every other agent must feed into it
+            consumed = {name for upstream in depends_on.values() for name in upstream}
+            unused = [agent for agent in flow[:-1] if agent not in consumed]
+            if unused:
+                print(f"Task '{resource_name}' agent '{unused[0]}' has no downstream agent consuming its output")
+                return False
+
+            if len(flow) > 1 and not depends_on.get(flow[-1]):
+                print(f"Task '{resource_name}' final agent '{flow[-1]}' must depend on other agents")
+                return False
+
+        max_waiters = resource.params.get("coalesce_max_waiters")
+        if max_waiters is not None and (not isinstance(max_waiters, int) or max_waiters < 1):
+            print(f"Task '{resource_name}' coalesce_max_waiters must be a positive integer")
+            return False
+
     return True
 
 
@@ -153,6 +336,20 @@ def verify_deployment(resources, config):
                 print(f"Deployment '{resource_name}' references non-existent expose task '{task}'")
                 return False
 
+        workers = resource.workers
+        if not isinstance(workers, int) or isinstance(workers, bool) or workers < 1:
+            print(f"Deployment '{resource_name}' workers must be a positive integer")
+            return False
+
+        tracing = resource.params.get("tracing")
+        if tracing not in [None, True, False, "file", "console", "otlp"]:
+            print(f"Deployment '{resource_name}' references unavailable tracing exporter '{tracing}'")
+            return False
+
+        if not isinstance(resource.params.get("metrics", True), bool):
+            print(f"Deployment '{resource_name}' metrics must be true or false")
+            return False
+
     return True
 
 
@@ -22,8 +22,36 @@ def apply() -> None:
 
 
 @app.command()
-def run() -> None:
-    commands.run()
+def run(deployment: str = "default") -> None:
+    commands.run(deployment)
+
+
+@app.command()
+def batch(
+    task: str,
+    input: str = typer.Option(..., "--input", help="JSONL file of task inputs"),
+    output: str = typer.Option(..., "--output", help="JSONL file results are appended to; reruns resume from it"),
+    concurrency: int = 8,
+    provider_batch: bool = typer.Option(False, help="Use the provider batch API (single-agent tasks only)"),
+    batch_size: int = 10000,
+    poll_interval: float = 30.0,
+) -> None:
+    commands.batch(task, input, output, concurrency, provider_batch, batch_size, poll_interval)
+
+
+@app.command()
+def bench(
+    task: str,
+    input: str = typer.Option(..., "--input", help="JSON request body, or a path / @file: to read it from"),
+    deployment: str = "default",
+    url: str = typer.Option(None, help="Benchmark a running server instead of serving the deployment in-process"),
+    requests: int = typer.Option(None, help="Requests to send (default 200, unlimited with --duration)"),
+    concurrency: int = 8,
+    qps: float = typer.Option(None, help="Pace request starts at this rate instead of sending back to back"),
+    duration: float = typer.Option(None, help="Stop sending after this many seconds"),
+    warmup: int = 5,
+) -> None:
+    commands.bench(task, input, deployment, url, requests, concurrency, qps, duration, warmup)
 
 
 @app.command()
@@ -0,0 +1,341 @@
+import asyncio
+import atexit
+import json
+import math
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Callable, Iterable, Optional
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+class Metric:
+    """
+    A named family of samples keyed by label values. Updates take one short per-metric lock.
+    """
+
+    type = None
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> list:
+        with self._lock:
+            return [[dict(zip(self.labelnames, key)), value] for key, value in self._values.items()]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            # Buckets are stored non-cumulative and summed when rendered
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["buckets"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def samples(self) -> list:
+        with self._lock:
+            return [[dict(zip(self.labelnames, key)), {"buckets": list(state["buckets"]), "sum": state["sum"],
+                                                       "count": state["count"], "bounds": list(self.buckets)}]
+                    for key, state in self._values.items()]
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+
+class Registry:
+    """
+    Holds metrics updated in place plus collectors: callables that, at scrape time, return
+    (name, type, help, samples) families read from objects that already keep their own counts
+    (caches, rate limiters, LLM usage), so the hot path does no extra work for them.
+    """
+
+    def __init__(self):
+        self.metrics: dict[str, Metric] = {}
+        self.collectors: list[Callable[[], list]] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: Metric) -> Metric:
+        with self._lock:
+            return self.metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Iterable[str] = (),
+                  buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def register_collector(self, collector: Callable[[], list]):
+        with self._lock:
+            self.collectors.append(collector)
+
+    def clear_collectors(self):
+        """Drop every collector, e.g. before a new resource graph registers its own."""
+        with self._lock:
+            self.collectors = []
+
+    def snapshot(self) -> dict:
+        """
+        JSON-serializable state of every metric: {name: {"type", "help", "samples": [[labels, value], ...]}}.
+        """
+        families = {}
+        for metric in list(self.metrics.values()):
+            families[metric.name] = {"type": metric.type, "help": metric.help, "samples": metric.samples()}
+
+        for collector in list(self.collectors):
+            for name, metric_type, help, samples in collector():
+                family = families.setdefault(name, {"type": metric_type, "help": help, "samples": []})
+                family["samples"].extend(samples)
+
+        return families
+
+
+REGISTRY = Registry()
+
+REQUESTS = REGISTRY.counter("modulus_requests_total", "Task requests handled", ["route", "status"])
+REQUEST_DURATION = REGISTRY.histogram("modulus_request_duration_seconds", "Task request latency", ["route"])
+REQUESTS_IN_FLIGHT = REGISTRY.gauge("modulus_requests_in_flight", "Task requests being handled", ["route"])
+LLM_CALL_DURATION = REGISTRY.histogram("modulus_llm_call_duration_seconds", "LLM call latency",
+                                       ["provider", "model"])
+LLM_ERRORS = REGISTRY.counter("modulus_llm_errors_total", "Failed LLM calls by status code or error type",
+                              ["provider", "model", "status"])
+MEMORY_QUERY_DURATION = REGISTRY.histogram("modulus_memory_query_duration_seconds", "Memory query latency")
+
+
+@contextmanager
+def track_request(route: str):
+    REQUESTS_IN_FLIGHT.inc(route=route)
+    started = time.perf_counter()
+    status = "500"
+    try:
+        yield
+        status = "200"
+    except Exception as e:
+        status = str(getattr(e, "status_code", 500))
+        raise
+    except (asyncio.CancelledError, GeneratorExit):
+        # The client went away mid-response (nginx's "client closed request")
+        status = "499"
+        raise
+    finally:
+        REQUESTS_IN_FLIGHT.dec(route=route)
+        REQUEST_DURATION.observe(time.perf_counter() - started, route=route)
+        REQUESTS.inc(route=route, status=status)
+
+
+@contextmanager
+def track_llm_call(provider: str, model: str):
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        status = getattr(e, "status_code", None) or type(e).__name__
+        LLM_ERRORS.inc(provider=provider, model=model, status=status)
+        raise
+    finally:
+        LLM_CALL_DURATION.observe(time.perf_counter() - started, provider=provider, model=model)
+
+
+def merge_snapshots(snapshots: list[dict]) -> dict:
+    """
+    Sum samples with identical labels across snapshots (e.g. one per worker process).
+    """
+    merged = {}
+    for snapshot in snapshots:
+        for name, family in snapshot.items():
+            target = merged.setdefault(name, {"type": family["type"], "help": family["help"], "samples": {}})
+            for labels, value in family["samples"]:
+                key = tuple(sorted(labels.items()))
+                current = target["samples"].get(key)
+                if current is None:
+                    target["samples"][key] = json.loads(json.dumps(value)) if isinstance(value, dict) else value
+                elif isinstance(value, dict):
+                    current["buckets"] = [a + b for a, b in zip(current["buckets"], value["buckets"])]
+                    current["sum"] += value["sum"]
+                    current["count"] += value["count"]
+                else:
+                    target["samples"][key] = current + value
+
+    for family in merged.values():
+        family["samples"] = [[dict(key), value] for key, value in family["samples"].items()]
+    return merged
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels: dict, extra: Optional[tuple] = None) -> str:
+    items = list(labels.items()) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(snapshot: dict) -> str:
+    """
+    Prometheus text exposition format (version 0.0.4).
+    """
+    lines = []
+    for name, family in sorted(snapshot.items()):
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+
+        for labels, value in family["samples"]:
+            if family["type"] != "histogram":
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+                continue
+
+            cumulative = 0
+            for bound, count in zip(value["bounds"], value["buckets"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(labels, ('le', _number(bound)))} {cumulative}")
+            lines.append(f"{name}_bucket{_labels(labels, ('le', '+Inf'))} {value['count']}")
+            lines.append(f"{name}_sum{_labels(labels)} {_number(value['sum'])}")
+            lines.append(f"{name}_count{_labels(labels)} {value['count']}")
+
+    return "\n".join(lines) + "\n"
+
+
+class MultiProcessStore:
+    """
+    Shares metrics between the worker processes of one deployment through a directory.
+
+    Each worker writes its snapshot to `<path>/<pid>.json` every `interval` seconds, on scrape and at
+    exit, and a scrape served by any worker merges every file. Counters and histograms of workers that
+    have exited are kept so totals never go backwards; their gauges are dropped.
+    """
+
+    def __init__(self, path: str, registry: Registry = REGISTRY, interval: float = 5.0):
+        self.path = path
+        self.registry = registry
+        self.interval = interval
+        os.makedirs(path, exist_ok=True)
+
+        self._file = os.path.join(path, f"{os.getpid()}.json")
+        self._thread = threading.Thread(target=self._run, name="modulus-metrics", daemon=True)
+        self._thread.start()
+        atexit.register(self.write)
+
+    def write(self) -> dict:
+        snapshot = self.registry.snapshot()
+        tmp_path = self._file + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self._file)
+        return snapshot
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            self.write()
+
+    def collect(self) -> dict:
+        snapshots = [self.write()]
+
+        for filename in os.listdir(self.path):
+            if not filename.endswith(".json") or os.path.join(self.path, filename) == self._file:
+                continue
+
+            try:
+                with open(os.path.join(self.path, filename), "r", encoding="utf-8") as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+
+            if not _alive(int(filename[:-len(".json")])):
+                snapshot = {name: family for name, family in snapshot.items() if family["type"] != "gauge"}
+            snapshots.append(snapshot)
+
+        return merge_snapshots(snapshots)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+_store: Optional[MultiProcessStore] = None
+
+
+def enable_multiprocess(path: str):
+    global _store
+    if _store is None:
+        _store = MultiProcessStore(path)
+
+
+def scrape() -> str:
+    """
+    Render this process's metrics, or every worker's when multiprocess collection is enabled.
+    """
+    if _store is not None:
+        return render(_store.collect())
+    return render(merge_snapshots([REGISTRY.snapshot()]))
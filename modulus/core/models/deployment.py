@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Dict, List
+from typing import Dict, List, Any
 
 
 @dataclass
@@ -8,3 +8,6 @@ class DeploymentConfig:
     runtime: str
     expose: List[str]
     port: int
+    host: str = "0.0.0.0"
+    workers: int = 1
+    params: Dict[str, Any] = field(default_factory=dict)
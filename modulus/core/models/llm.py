@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 @dataclass
 class LLMConfig:
@@ -8,4 +8,5 @@ class LLMConfig:
     model: str
     temperature: float = 0.7
     max_tokens: Optional[int] = None
+    routes: Optional[List[str]] = None
     params: Dict[str, Any] = field(default_factory=dict)
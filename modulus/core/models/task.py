@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 
 @dataclass
@@ -10,4 +10,5 @@ class TaskConfig:
     input_schema: Dict[str, str]
     output_schema: Dict[str, str]
     output_intermediate: bool = False
+    depends_on: Optional[Dict[str, List[str]]] = None
     params: Dict[str, Any] = field(default_factory=dict)
\ No newline at end of file
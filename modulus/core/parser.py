@@ -60,13 +60,22 @@ class TomlParser():
     def parse_llm_block(self, name: str, block: Dict[str, Any]) -> LLMConfig:
         """
         Parse a single [llm.<name>] block into an LLMConfig instance.
+        A block with `routes` is a router over other LLMs and has no provider or model of its own.
         """
-        provider: str = _get_required_opt_typed("llm", name, "provider", block, str)
-        model: str = _get_required_opt_typed("llm", name, "model", block, str)
+        routes = block.get("routes")
+        if routes is not None:
+            routes = _get_required_opt_typed("llm", name, "routes", block, list)
+            if not routes:
+                raise ValueError(f"llm.{name} has an empty 'routes'")
+            provider = None
+            model = None
+        else:
+            provider: str = _get_required_opt_typed("llm", name, "provider", block, str)
+            model: str = _get_required_opt_typed("llm", name, "model", block, str)
 
         temperature = block.get("temperature", 0.7)
         max_tokens = block.get("max_tokens")
-        known_keys = {"provider", "model", "temperature", "max_tokens"}
+        known_keys = {"provider", "model", "temperature", "max_tokens", "routes"}
         params = {k: v for k, v in block.items() if k not in known_keys}
 
         return LLMConfig(
@@ -75,6 +84,7 @@ class TomlParser():
             model=model,
             temperature=temperature,
             max_tokens=max_tokens,
+            routes=routes,
             params=params
         )
 
@@ -123,7 +133,15 @@ class TomlParser():
         input_schema: Dict[str, str] = _get_required_opt_typed("task", name, "input_schema", block, dict)
         output_schema: Dict[str, str] = _get_required_opt_typed("task", name, "output_schema", block, dict)
         output_intermediate: bool = block.get("output_intermediate", False)
-        known_keys = {"description", "flow", "input_schema", "output_schema"}
+        depends_on = block.get("depends_on")
+        if depends_on is not None and not isinstance(depends_on, dict):
+            raise ValueError(f"task.{name} has invalid type for 'depends_on': expected dict, got {type(depends_on).__name__}")
+        for agent, upstream in (depends_on or {}).items():
+            if not isinstance(upstream, list) or not all(isinstance(n, str) for n in upstream):
+                raise ValueError(
+                    f"task.{name} has invalid type for 'depends_on.{agent}': expected list of agent names, got {upstream!r}"
+                )
+        known_keys = {"description", "flow", "input_schema", "output_schema", "depends_on"}
         params = {k: v for k, v in block.items() if k not in known_keys}
 
         return TaskConfig(
@@ -133,6 +151,7 @@ class TomlParser():
             input_schema=input_schema,
             output_schema=output_schema,
             output_intermediate=output_intermediate,
+            depends_on=depends_on,
             params=params
         )
 
@@ -178,12 +197,23 @@ class TomlParser():
         runtime: str = _get_required_opt_typed("deployment", name, "runtime", block, str)
         expose: list[str] = _get_required_opt_typed("deployment", name, "expose", block, list)
         port: int = _get_required_opt_typed("deployment", name, "port", block, int)
+        host: str = block.get("host", "0.0.0.0")
+        workers: int = block.get("workers", 1)
+        if not isinstance(workers, int) or isinstance(workers, bool):
+            raise ValueError(f"deployment.{name} has invalid type for 'workers': expected int, got {type(workers).__name__}")
+        if workers < 1:
+            raise ValueError(f"deployment.{name} 'workers' must be at least 1")
+        known_keys = {"runtime", "expose", "port", "host", "workers"}
+        params = {k: v for k, v in block.items() if k not in known_keys}
 
         return DeploymentConfig(
             name=name,
             runtime=runtime,
             expose=expose,
             port=port,
+            host=host,
+            workers=workers,
+            params=params
         )
 
     def parse_vars_block(self, block: Dict[str, Any]) -> VarsConfig:
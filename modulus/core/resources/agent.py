@@ -1,22 +1,208 @@
-from modulus.core.resources.llm.llm import LLM
+import asyncio
+import contextvars
+import json
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Iterator, Optional
+
+from modulus.core.resources.llm.llm import LLM, ToolCall
+from modulus.core.resources.memory import Memory
 from modulus.core.resources.tool import Tool
+from modulus.core.stages import stage
+from modulus.core.tracing import current_span, start_span
+
+
+def _tool_output(result: Any) -> str:
+    return result if isinstance(result, str) else json.dumps(result, default=str)
+
+
+def retrieval_query(input_data: Any) -> str:
+    """
+    Text to search memory with for a task input: the input itself, or the string fields of an object input.
+    """
+    if isinstance(input_data, str):
+        return input_data
+    if isinstance(input_data, dict):
+        fields = [value for value in input_data.values() if isinstance(value, str)]
+        if fields:
+            return "\n".join(fields)
+    return json.dumps(input_data)
 
 
 class Agent:
-    def __init__(self, name: str, llm: LLM, prompt: str = None, tools: dict[str, Tool] = None, max_iter=5):
+    """
+    An LLM with a prompt and optional tools.
+
+    With tools, messages run a tool-use loop of at most `max_iter` LLM turns: every tool call the model
+    requests in a turn is executed concurrently, the results are sent back, and the final turn is made
+    without tools so the agent always answers.
+
+    With `memory`, every message is augmented with the `rag_k` passages of memory most similar to
+    the input (scoring at least `rag_min_score`). Tasks start this retrieval with `prefetch` as soon
+    as the flow starts, so it overlaps upstream agents instead of adding a round trip before the LLM call.
+    """
+
+    def __init__(self, name: str, llm: LLM, prompt: str = None, tools: dict[str, Tool] = None, max_iter=5,
+                 memory: Memory = None, rag_k: int = 5, rag_min_score: Optional[float] = None):
         self.name = name
         self.llm = llm
         self.prompt = prompt
-        self.tools = tools
+        self.tools = tools or {}
         self.max_iter = max_iter
+        self.memory = memory
+        self.rag_k = rag_k
+        self.rag_min_score = rag_min_score
+        self._pool = None
 
-    def message(self, input_text: str, injected_prompt: str = None) -> str:
-        full_input = input_text
-
-        if self.prompt:
-            full_input = f"{self.prompt}\n\nUser: {input_text}"
+    def _build_input(self, input_text: str, injected_prompt: str = None, context: list[dict] = None) -> str:
+        # The agent prompt is sent separately as the system segment so providers can cache it
+        if context:
+            passages = "\n".join(f"[{n}] {result['text']}" for n, result in enumerate(context, start=1))
+            input_text = f"Context:\n{passages}\n\n{input_text}"
 
         if injected_prompt:
-            full_input = f"{injected_prompt}\n\n{full_input}"
+            return f"{injected_prompt}\n\n{input_text}"
+
+        return input_text
+
+    def retrieve(self, query: str) -> list[dict]:
+        with stage("retrieve"):
+            return self.memory.search(query, self.rag_k, self.rag_min_score)
+
+    async def aretrieve(self, query: str) -> list[dict]:
+        return await asyncio.to_thread(self.retrieve, query)
+
+    def prefetch(self, query: str) -> Future:
+        """Start retrieval on a worker thread, so it runs while the caller does other work."""
+        return self._executor().submit(contextvars.copy_context().run, self.retrieve, query)
+
+    def _span(self):
+        return start_span(f"agent {self.name}", **{"agent.name": self.name, "llm.model": self.llm.get_model()})
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(thread_name_prefix=f"modulus-{self.name}-tools")
+        return self._pool
+
+    def _tool_message(self, call: ToolCall, output: str, is_error: bool = False) -> dict:
+        return {"role": "tool", "tool_call_id": call.id, "content": output, "is_error": is_error}
+
+    def _check_call(self, call: ToolCall):
+        if call.name not in self.tools:
+            raise ValueError(f"Unknown tool '{call.name}'")
+        if not isinstance(call.arguments, dict):
+            raise ValueError(f"Tool arguments are not a JSON object: {call.arguments}")
+
+    # Tool errors are sent back to the model, which can retry or answer without the result
+    def _call_tool(self, call: ToolCall) -> dict:
+        try:
+            self._check_call(call)
+            return self._tool_message(call, _tool_output(self.tools[call.name].run(call.arguments)))
+        except Exception as e:
+            return self._tool_message(call, f"{type(e).__name__}: {e}", is_error=True)
+
+    async def _acall_tool(self, call: ToolCall) -> dict:
+        try:
+            self._check_call(call)
+            return self._tool_message(call, _tool_output(await self.tools[call.name].arun(call.arguments)))
+        except Exception as e:
+            return self._tool_message(call, f"{type(e).__name__}: {e}", is_error=True)
+
+    def _run_tools(self, calls: list[ToolCall]) -> list[dict]:
+        current_span().add_to_attribute("agent.tool_calls", len(calls))
+        if len(calls) == 1:
+            return [self._call_tool(calls[0])]
+
+        # Workers run in a copy of this context so tool spans stay in the request's trace
+        futures = [self._executor().submit(contextvars.copy_context().run, self._call_tool, call) for call in calls]
+        return [future.result() for future in futures]
+
+    async def _arun_tools(self, calls: list[ToolCall]) -> list[dict]:
+        current_span().add_to_attribute("agent.tool_calls", len(calls))
+        return list(await asyncio.gather(*(self._acall_tool(call) for call in calls)))
+
+    def _converse(self, prompt: str) -> str:
+        messages = [{"role": "user", "content": prompt}]
+        tools = [tool.spec() for tool in self.tools.values()]
+
+        for turn in range(self.max_iter):
+            with stage("llm"):
+                reply = self.llm.chat(messages, system=self.prompt, tools=tools,
+                                      tool_choice="none" if turn == self.max_iter - 1 else "auto")
+            if not reply["tool_calls"]:
+                return reply["content"]
+
+            messages.append(reply)
+            with stage("tools"):
+                messages.extend(self._run_tools(reply["tool_calls"]))
+
+        return reply["content"]
+
+    async def _aconverse(self, prompt: str) -> str:
+        messages = [{"role": "user", "content": prompt}]
+        tools = [tool.spec() for tool in self.tools.values()]
+
+        for turn in range(self.max_iter):
+            with stage("llm"):
+                reply = await self.llm.achat(messages, system=self.prompt, tools=tools,
+                                             tool_choice="none" if turn == self.max_iter - 1 else "auto")
+            if not reply["tool_calls"]:
+                return reply["content"]
+
+            messages.append(reply)
+            with stage("tools"):
+                messages.extend(await self._arun_tools(reply["tool_calls"]))
+
+        return reply["content"]
+
+    # Retrieval runs here only when the caller hasn't already fetched the context
+    def message(self, input_text: str, injected_prompt: str = None, context: list[dict] = None) -> str:
+        with self._span():
+            if self.memory is not None and context is None:
+                context = self.retrieve(retrieval_query(input_text))
+
+            prompt = self._build_input(input_text, injected_prompt, context)
+            if self.tools:
+                return self._converse(prompt)
+            with stage("llm"):
+                return self.llm.query(prompt, system=self.prompt)
+
+    async def amessage(self, input_text: str, injected_prompt: str = None, context: list[dict] = None) -> str:
+        with self._span():
+            if self.memory is not None and context is None:
+                context = await self.aretrieve(retrieval_query(input_text))
+
+            prompt = self._build_input(input_text, injected_prompt, context)
+            if self.tools:
+                return await self._aconverse(prompt)
+            with stage("llm"):
+                return await self.llm.aquery(prompt, system=self.prompt)
+
+    # With tools, the loop runs to completion and the answer is streamed as a single chunk
+    def _stream_message(self, input_text: str, injected_prompt: str = None,
+                        context: list[dict] = None) -> Iterator[str]:
+        yield self.message(input_text, injected_prompt, context)
+
+    async def _astream_message(self, input_text: str, injected_prompt: str = None,
+                               context: list[dict] = None) -> AsyncIterator[str]:
+        yield await self.amessage(input_text, injected_prompt, context)
+
+    async def _astream_retrieved(self, input_text: str, injected_prompt: str = None) -> AsyncIterator[str]:
+        context = await self.aretrieve(retrieval_query(input_text))
+        async for chunk in self.astream(input_text, injected_prompt, context):
+            yield chunk
+
+    def stream(self, input_text: str, injected_prompt: str = None, context: list[dict] = None) -> Iterator[str]:
+        if self.tools:
+            return self._stream_message(input_text, injected_prompt, context)
+        if self.memory is not None and context is None:
+            context = self.retrieve(retrieval_query(input_text))
+        return self.llm.stream(self._build_input(input_text, injected_prompt, context), system=self.prompt)
 
-        return self.llm.query(full_input)
+    def astream(self, input_text: str, injected_prompt: str = None,
+                context: list[dict] = None) -> AsyncIterator[str]:
+        if self.tools:
+            return self._astream_message(input_text, injected_prompt, context)
+        if self.memory is not None and context is None:
+            return self._astream_retrieved(input_text, injected_prompt)
+        return self.llm.astream(self._build_input(input_text, injected_prompt, context), system=self.prompt)
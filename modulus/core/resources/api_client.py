@@ -0,0 +1,102 @@
+import threading
+import time
+
+import httpx
+
+
+class ApiError(RuntimeError):
+    """An API tool's endpoint answered with an error status."""
+
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class CircuitOpenError(RuntimeError):
+    """The endpoint's circuit breaker is open, so the request was not sent."""
+
+
+class CircuitBreaker:
+    """
+    Stop calling an endpoint that keeps failing.
+
+    After `failure_threshold` consecutive failures (connection errors, timeouts, 5xx) the circuit opens
+    and requests fail immediately for `cooldown` seconds. Then a single probe request is let through:
+    success closes the circuit, failure opens it for another cooldown.
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    raise CircuitOpenError(f"Circuit open after {self.consecutive_failures} consecutive failures")
+                # This request is the probe
+                self.state = "half_open"
+            elif self.state == "half_open":
+                raise CircuitOpenError("Circuit half-open, waiting for the probe request")
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+
+    def release(self):
+        """The request ended without an answer; if it was the probe, the next request probes instead."""
+        with self._lock:
+            if self.state == "half_open":
+                self.state = "open"
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class ApiClient:
+    """
+    Connection pools shared by every API tool, so tool calls reuse keep-alive connections
+    instead of each opening a fresh one.
+
+    Settings, like a provider's: max_connections, max_keepalive_connections, keepalive_expiry,
+    http2, timeout, connect_timeout.
+    """
+
+    def __init__(self, params: dict = None):
+        self.params = params or {}
+        self._client = None
+        self._async_client = None
+        self._lock = threading.Lock()
+
+    def _options(self) -> dict:
+        timeout = self.params.get("timeout", 30.0)
+        return dict(
+            limits=httpx.Limits(
+                max_connections=self.params.get("max_connections", 100),
+                max_keepalive_connections=self.params.get("max_keepalive_connections", 20),
+                keepalive_expiry=self.params.get("keepalive_expiry", 5.0),
+            ),
+            timeout=httpx.Timeout(timeout, connect=self.params.get("connect_timeout", 5.0)),
+            http2=self.params.get("http2", False),
+        )
+
+    def get_client(self) -> httpx.Client:
+        with self._lock:
+            if self._client is None:
+                self._client = httpx.Client(**self._options())
+        return self._client
+
+    def get_async_client(self) -> httpx.AsyncClient:
+        with self._lock:
+            if self._async_client is None:
+                self._async_client = httpx.AsyncClient(**self._options())
+        return self._async_client
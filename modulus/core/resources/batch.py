@@ -0,0 +1,209 @@
+import asyncio
+import json
+import os
+
+from typing import Any, AsyncIterable, AsyncIterator, Iterable, Iterator, Optional, Union
+
+from modulus.core.resources.agent import retrieval_query
+from modulus.core.resources.llm import LLM
+from modulus.core.resources.task import Task
+
+
+def parse_batch_line(line: str, line_number: int) -> Optional[tuple[Any, Any]]:
+    """
+    Parse one JSONL input line into an (id, input) pair, or None for a blank line.
+    A line is either {"id": ..., "input": ...} or the raw input, identified by its line number.
+    """
+    line = line.strip()
+    if not line:
+        return None
+
+    item = json.loads(line)
+    if isinstance(item, dict) and "input" in item:
+        return item.get("id", line_number), item["input"]
+    return line_number, item
+
+
+def read_batch_file(path: str) -> Iterator[tuple[Any, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            item = parse_batch_line(line, line_number)
+            if item is not None:
+                yield item
+
+
+def _id_key(item_id: Any) -> str:
+    return json.dumps(item_id)
+
+
+def _completed_ids(output_path: str) -> set[str]:
+    """
+    Ids with an output in an existing results file. A partial last line left by an
+    interrupted write is truncated away.
+    """
+    if not os.path.isfile(output_path):
+        return set()
+
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+
+    completed = set()
+    for line in data[:end].decode("utf-8").splitlines():
+        if line.strip():
+            result = json.loads(line)
+            if "output" in result:
+                completed.add(_id_key(result["id"]))
+    return completed
+
+
+async def _aiter(items: Union[Iterable, AsyncIterable]) -> AsyncIterator:
+    if hasattr(items, "__aiter__"):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+def _base_llm(llm: LLM) -> LLM:
+    # Batch APIs bypass the caching/retry/routing wrappers and talk to the provider LLM directly
+    while not llm.supports_batch and hasattr(llm, "llm"):
+        llm = llm.llm
+    return llm
+
+
+class BatchRunner:
+    """
+    Push many inputs through one task.
+
+    Results are {"id": ..., "output": ...} or {"id": ..., "error": ...} dicts, produced as each input
+    finishes (not in input order). Online runs keep at most `concurrency` flows in flight.
+
+    With `provider_batch`, single-agent tasks are instead sent through the provider's batch API
+    (OpenAI Batch, Anthropic Message Batches) in chunks of `batch_size`: cheaper and higher throughput,
+    but results arrive only when the provider finishes the batch (up to 24h).
+    """
+
+    def __init__(self, task: Task, concurrency: int = 8, provider_batch: bool = False,
+                 batch_size: int = 10000, poll_interval: float = 30.0):
+        self.task = task
+        self.concurrency = concurrency
+        self.provider_batch = provider_batch
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+
+        if provider_batch:
+            if len(task.flow) != 1:
+                raise ValueError(f"Task {task.name} has more than one agent, provider batches need a single agent")
+            if task.flow[0].tools:
+                raise ValueError(f"Task {task.name} agent uses tools, which provider batches cannot run")
+            if not _base_llm(task.flow[0].llm).supports_batch:
+                raise ValueError(f"Task {task.name} LLM does not support provider batches")
+
+    async def _run_one(self, item_id: Any, input_data: Any) -> dict:
+        try:
+            return {"id": item_id, "output": await self.task.astart(input_data)}
+        except Exception as e:
+            return {"id": item_id, "error": f"{type(e).__name__}: {e}"}
+
+    async def arun(self, items: Union[Iterable, AsyncIterable]) -> AsyncIterator[dict]:
+        """
+        Run (id, input) pairs through the task online. Inputs are consumed lazily, so `items`
+        can be a stream much larger than memory.
+        """
+        pending = set()
+
+        try:
+            async for item_id, input_data in _aiter(items):
+                if len(pending) >= self.concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for finished in done:
+                        yield finished.result()
+
+                pending.add(asyncio.ensure_future(self._run_one(item_id, input_data)))
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    yield finished.result()
+        finally:
+            for unfinished in pending:
+                unfinished.cancel()
+
+    def _batch_request(self, custom_id: str, input_data: Any) -> tuple[str, str, str]:
+        agent = self.task.flow[0]
+        agent_input, injected_prompt = self.task._agent_input(0, input_data, {})
+        if not isinstance(agent_input, str):
+            agent_input = json.dumps(agent_input)
+        context = agent.retrieve(retrieval_query(input_data)) if agent.memory is not None else None
+        return custom_id, agent._build_input(agent_input, injected_prompt, context), agent.prompt
+
+    def _collect(self, pending: dict) -> Iterator[dict]:
+        llm = _base_llm(self.task.flow[0].llm)
+        results = llm.collect_batch(pending["batch_id"], self.poll_interval)
+
+        for custom_id, item_id in pending["ids"].items():
+            result = results.get(custom_id, RuntimeError("Missing from batch results"))
+            if isinstance(result, Exception):
+                yield {"id": item_id, "error": f"{type(result).__name__}: {result}"}
+            else:
+                yield {"id": item_id, "output": self.task._format_result({0: result})}
+
+    def run_file(self, input_path: str, output_path: str) -> dict:
+        """
+        Run a JSONL input file, appending JSONL results to `output_path`.
+
+        The output file is the checkpoint: inputs whose id already has an output there are skipped,
+        so rerunning after an interruption resumes where it stopped (failed inputs are retried).
+        Submitted provider batches are recorded in `<output_path>.batch` and collected on resume
+        instead of being resubmitted.
+        """
+        completed = _completed_ids(output_path)
+        counts = {"skipped": len(completed), "succeeded": 0, "failed": 0}
+
+        with open(output_path, "a", encoding="utf-8") as out:
+            def write(result: dict):
+                out.write(json.dumps(result) + "\n")
+                out.flush()
+                counts["failed" if "error" in result else "succeeded"] += 1
+                if "output" in result:
+                    completed.add(_id_key(result["id"]))
+
+            if not self.provider_batch:
+                async def drain():
+                    remaining = (item for item in read_batch_file(input_path) if _id_key(item[0]) not in completed)
+                    async for result in self.arun(remaining):
+                        write(result)
+
+                asyncio.run(drain())
+                return counts
+
+            checkpoint_path = output_path + ".batch"
+            if os.path.isfile(checkpoint_path):
+                with open(checkpoint_path, "r", encoding="utf-8") as f:
+                    for result in self._collect(json.load(f)):
+                        write(result)
+                os.remove(checkpoint_path)
+
+            remaining = (item for item in read_batch_file(input_path) if _id_key(item[0]) not in completed)
+            while True:
+                chunk = [item for _, item in zip(range(self.batch_size), remaining)]
+                if not chunk:
+                    break
+
+                requests = [self._batch_request(f"item-{n}", input_data) for n, (_, input_data) in enumerate(chunk)]
+                batch_id = _base_llm(self.task.flow[0].llm).submit_batch(requests)
+                pending = {"batch_id": batch_id, "ids": {f"item-{n}": item_id for n, (item_id, _) in enumerate(chunk)}}
+
+                with open(checkpoint_path, "w", encoding="utf-8") as f:
+                    json.dump(pending, f)
+
+                for result in self._collect(pending):
+                    write(result)
+                os.remove(checkpoint_path)
+
+        return counts
+
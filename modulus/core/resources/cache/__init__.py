@@ -0,0 +1,3 @@
+from .cache import Cache, MISS, make_key
+from .memory_cache import MemoryCache
+from .disk_cache import DiskCache
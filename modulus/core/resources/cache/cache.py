@@ -0,0 +1,82 @@
+import hashlib
+import json
+import threading
+
+from abc import ABC, abstractmethod
+from typing import Any, Optional
+
+
+# Returned by Cache.get on a miss so that falsy values (None, "", 0) can still be cached
+MISS = object()
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Build a stable cache key from JSON-serializable parts.
+    """
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Cache(ABC):
+    def __init__(self, max_entries: Optional[int] = None, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    @abstractmethod
+    def _get(self, key: str) -> tuple[Any, Optional[float]]:
+        """Return the stored value (or MISS) and the seconds it has left to live (None if it never expires)."""
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Store `value`; `ttl` overrides the cache's ttl for this entry."""
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    def get(self, key: str) -> Any:
+        return self.get_entry(key)[0]
+
+    def get_entry(self, key: str) -> tuple[Any, Optional[float]]:
+        """
+        Return the value (or MISS) and its remaining ttl, so tiered caches can promote an entry
+        without extending its lifetime.
+        """
+        value, expires_in = self._get(key)
+
+        with self._stats_lock:
+            if value is MISS:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        return value, expires_in
+
+    # Async callers use these so that blocking backends can move their I/O off the event loop
+    async def aget(self, key: str) -> Any:
+        return self.get(key)
+
+    async def aget_entry(self, key: str) -> tuple[Any, Optional[float]]:
+        return self.get_entry(key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.set(key, value, ttl)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "entries": len(self),
+        }
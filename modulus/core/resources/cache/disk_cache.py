@@ -0,0 +1,95 @@
+import asyncio
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from typing import Any, Optional
+
+from modulus.core.resources.cache.cache import Cache, MISS
+
+
+class DiskCache(Cache):
+    """
+    SQLite-backed cache that survives restarts. Entries are evicted least recently used first
+    once max_entries is exceeded, and lazily expired after ttl seconds.
+    """
+
+    def __init__(self, path: str, max_entries: Optional[int] = None, ttl: Optional[float] = None):
+        super().__init__(max_entries, ttl)
+        self.path = path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed)")
+
+        return self._conn
+
+    def _get(self, key: str) -> tuple[Any, Optional[float]]:
+        now = time.time()
+
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value, created FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return MISS, None
+
+            value, created = row
+            if self.ttl and created + self.ttl < now:
+                conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+                return MISS, None
+
+            conn.execute("UPDATE cache SET accessed = ? WHERE key = ?", (now, key))
+
+        return pickle.loads(value), created + self.ttl - now if self.ttl else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        # Entries expire `ttl` after `created`, so a shorter per-entry ttl backdates it
+        created = now - (self.ttl - ttl) if self.ttl and ttl is not None else now
+
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, created, accessed) VALUES (?, ?, ?, ?)",
+                (key, blob, created, now)
+            )
+
+            if self.max_entries is not None:
+                conn.execute(
+                    "DELETE FROM cache WHERE key IN "
+                    "(SELECT key FROM cache ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,)
+                )
+
+    # SQLite reads and writes block, so async callers run them on a worker thread
+    async def aget(self, key: str) -> Any:
+        return await asyncio.to_thread(self.get, key)
+
+    async def aget_entry(self, key: str) -> tuple[Any, Optional[float]]:
+        return await asyncio.to_thread(self.get_entry, key)
+
+    async def aset(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        await asyncio.to_thread(self.set, key, value, ttl)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection().execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM cache")
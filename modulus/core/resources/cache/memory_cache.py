@@ -0,0 +1,54 @@
+import threading
+import time
+
+from collections import OrderedDict
+from typing import Any, Optional
+
+from modulus.core.resources.cache.cache import Cache, MISS
+
+
+class MemoryCache(Cache):
+    """
+    In-process LRU cache with optional per-entry TTL.
+    """
+
+    def __init__(self, max_entries: Optional[int] = 1024, ttl: Optional[float] = None):
+        super().__init__(max_entries, ttl)
+        self._entries: OrderedDict[str, tuple[Optional[float], Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key: str) -> tuple[Any, Optional[float]]:
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISS, None
+
+            expires_at, value = entry
+            if expires_at is not None and expires_at < now:
+                del self._entries[key]
+                return MISS, None
+
+            self._entries.move_to_end(key)
+            return value, None if expires_at is None else expires_at - now
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        if ttl is None:
+            ttl = self.ttl or None
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+
+            if self.max_entries is not None:
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
@@ -5,17 +5,22 @@ from abc import ABC, abstractmethod
 
 class DeploymentRuntime(ABC):
     @abstractmethod
-    def start(self, tasks: List[Task], port: int):
+    def start(self, tasks: List[Task], port: int, host: str = "0.0.0.0", workers: int = 1, options: dict = None):
+        """Serve the tasks, blocking until the server shuts down."""
         pass
 
 
 class Deployment:
-    def __init__(self, name: str, expose: List[Task], port: int, runtime: DeploymentRuntime):
+    def __init__(self, name: str, expose: List[Task], port: int, runtime: DeploymentRuntime,
+                 host: str = "0.0.0.0", workers: int = 1, options: dict = None):
         self.name = name
         self.expose = expose
         self.port = port
         self.runtime = runtime
+        self.host = host
+        self.workers = workers
+        self.options = options or {}
 
     def start(self):
-        print(f"[modulus] Starting deployment: {self.name} on port {self.port}")
-        self.runtime.start(self.expose, self.port)
+        print(f"[modulus] Starting deployment: {self.name} on {self.host}:{self.port} ({self.workers} worker(s))")
+        self.runtime.start(self.expose, self.port, self.host, self.workers, self.options)
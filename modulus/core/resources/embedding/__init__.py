@@ -1,2 +1,3 @@
 from .embedding_model import EmbeddingModel
-from .openai_embedding import OpenAIEmbeddingModel
\ No newline at end of file
+from .openai_embedding import OpenAIEmbeddingModel
+from .cached_embedding import CachedEmbeddingModel
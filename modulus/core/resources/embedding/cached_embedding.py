@@ -0,0 +1,67 @@
+from typing import List
+
+import numpy as np
+
+from modulus.core.resources.cache import Cache, MISS, make_key
+from modulus.core.resources.embedding import EmbeddingModel
+
+
+class CachedEmbeddingModel(EmbeddingModel):
+    """
+    Content-addressed cache in front of an embedding model, keyed on model name and text.
+
+    `caches` are tiers checked in order (e.g. an in-memory LRU, then a DiskCache); a hit in a
+    later tier is promoted into the earlier ones. Vectors are stored as raw float32 bytes.
+    """
+
+    def __init__(self, embedder: EmbeddingModel, caches: List[Cache]):
+        self.embedder = embedder
+        self.caches = caches
+        self.model_name = getattr(embedder, "model_name", type(embedder).__name__)
+        self.max_batch_size = embedder.max_batch_size
+        self.max_batch_tokens = embedder.max_batch_tokens
+
+    def _key(self, text: str) -> str:
+        return make_key(self.model_name, text)
+
+    def _lookup(self, key: str):
+        for i, cache in enumerate(self.caches):
+            blob = cache.get(key)
+            if blob is not MISS:
+                for earlier in self.caches[:i]:
+                    earlier.set(key, blob)
+                return np.frombuffer(blob, dtype=np.float32).tolist()
+        return None
+
+    def _store(self, key: str, embedding: List[float]):
+        blob = np.asarray(embedding, dtype=np.float32).tobytes()
+        for cache in self.caches:
+            cache.set(key, blob)
+
+    def embed(self, text: str) -> List[float]:
+        key = self._key(text)
+
+        embedding = self._lookup(key)
+        if embedding is None:
+            embedding = self.embedder.embed(text)
+            self._store(key, embedding)
+
+        return embedding
+
+    def embed_batch(self, texts: List[str]) -> List[List[float]]:
+        keys = [self._key(text) for text in texts]
+        embeddings = [self._lookup(key) for key in keys]
+
+        # Only send texts we haven't seen, once each
+        missing = list(dict.fromkeys(text for text, embedding in zip(texts, embeddings) if embedding is None))
+        if missing:
+            fresh = dict(zip(missing, self.embedder.embed_batch(missing)))
+            for i, text in enumerate(texts):
+                if embeddings[i] is None:
+                    embeddings[i] = fresh[text]
+                    self._store(keys[i], fresh[text])
+
+        return embeddings
+
+    def stats(self) -> List[dict]:
+        return [cache.stats() for cache in self.caches]
@@ -1,9 +1,15 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterable, Iterator, List
 
 from modulus.core.resources.provider import Provider
+from modulus.core.util import estimate_tokens
+
 
 class EmbeddingModel(ABC):
+    # Provider limits for a single embed_batch request
+    max_batch_size: int = 2048
+    max_batch_tokens: int = 300_000
+
     def __init__(self, provider: Provider, model_name: str):
         pass
 
@@ -14,3 +20,23 @@ class EmbeddingModel(ABC):
     @abstractmethod
     def embed_batch(self, texts: List[str]) -> List[List[float]]:
         pass
+
+    def iter_batches(self, items: Iterable[tuple]) -> Iterator[list[tuple]]:
+        """
+        Group (text, ...) items into batches that respect max_batch_size and max_batch_tokens.
+        Consumes `items` lazily so arbitrarily large corpora can be streamed through.
+        """
+        batch, batch_tokens = [], 0
+
+        for item in items:
+            tokens = estimate_tokens(item[0])
+
+            if batch and (len(batch) >= self.max_batch_size or batch_tokens + tokens > self.max_batch_tokens):
+                yield batch
+                batch, batch_tokens = [], 0
+
+            batch.append(item)
+            batch_tokens += tokens
+
+        if batch:
+            yield batch
@@ -2,24 +2,32 @@ from typing import List
 
 from modulus.core.resources.embedding import EmbeddingModel
 from modulus.core.resources.provider import OpenAIProvider
+from modulus.core.util import estimate_tokens
 
 
 class OpenAIEmbeddingModel(EmbeddingModel):
+    max_batch_size = 2048
+    max_batch_tokens = 300_000
+
     def __init__(self, provider: OpenAIProvider, model_name: str):
         super().__init__(provider, model_name)
         self.provider = provider
         self.model_name = model_name
 
     def embed(self, text: str) -> List[float]:
-        response = self.provider.get_client().embeddings.create(
-            model=self.model_name,
-            input=text
-        )
+        with self.provider.limiter.limit(estimate_tokens(text)) as slot:
+            response = self.provider.get_client().embeddings.create(
+                model=self.model_name,
+                input=text
+            )
+            slot.actual_tokens = response.usage.total_tokens
         return response.data[0].embedding
 
     def embed_batch(self, texts: List[str]) -> List[List[float]]:
-        response = self.provider.get_client().embeddings.create(
-            model=self.model_name,
-            input=texts
-        )
+        with self.provider.limiter.limit(sum(estimate_tokens(text) for text in texts)) as slot:
+            response = self.provider.get_client().embeddings.create(
+                model=self.model_name,
+                input=texts
+            )
+            slot.actual_tokens = response.usage.total_tokens
         return [item.embedding for item in response.data]
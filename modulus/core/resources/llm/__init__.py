@@ -1,3 +1,7 @@
-from .llm import LLM
+from .llm import LLM, ToolCall
 from .openai_llm import OpenAILLM
 from .anthropic_llm import AnthropicLLM
+from .cached_llm import CachedLLM
+from .resilient_llm import ResilientLLM
+from .router_llm import RouterLLM
+from .mock_llm import MockLLM
@@ -1,10 +1,49 @@
+import json
+import time
+
+from typing import Any, AsyncIterator, Iterator
+
+import anthropic
+
 from anthropic import NOT_GIVEN
 
 from modulus.core.resources.provider import AnthropicProvider
-from modulus.core.resources.llm import LLM
+from modulus.core.resources.llm import LLM, ToolCall
+from modulus.core.util import estimate_tokens
+
+
+def _message_params(messages: list[dict]) -> list[dict]:
+    """
+    Convert neutral chat messages to Messages API params. Consecutive tool results are sent
+    together as one user message, as Anthropic requires after a turn with parallel tool calls.
+    """
+    params = []
+    for message in messages:
+        if message["role"] == "user":
+            params.append({"role": "user", "content": message["content"]})
+        elif message["role"] == "assistant":
+            blocks = [{"type": "text", "text": message["content"]}] if message.get("content") else []
+            blocks += [{"type": "tool_use", "id": call.id, "name": call.name,
+                        "input": call.arguments if isinstance(call.arguments, dict) else {}}
+                       for call in message.get("tool_calls", [])]
+            params.append({"role": "assistant", "content": blocks})
+        elif message["role"] == "tool":
+            block = {"type": "tool_result", "tool_use_id": message["tool_call_id"], "content": message["content"]}
+            if message.get("is_error"):
+                block["is_error"] = True
+
+            if params and params[-1]["role"] == "user" and isinstance(params[-1]["content"], list):
+                params[-1]["content"].append(block)
+            else:
+                params.append({"role": "user", "content": [block]})
+    return params
 
 
 class AnthropicLLM(LLM):
+    retryable_errors = (anthropic.APIConnectionError, anthropic.RateLimitError, anthropic.InternalServerError)
+    provider_errors = (anthropic.APIError,)
+    supports_batch = True
+
     def __init__(self, provider: AnthropicProvider, model: str, params: dict = {}):
         super().__init__(provider, model, params)
         self.model = model
@@ -14,7 +53,7 @@ class AnthropicLLM(LLM):
     def get_model(self):
         return self.model
 
-    def query(self, prompt: str) -> str:
+    def _request_kwargs(self, prompt: str, system: str = None) -> dict:
         temperature = self.params.get('temperature')
         if temperature is None:
             temperature = NOT_GIVEN
@@ -23,7 +62,13 @@ class AnthropicLLM(LLM):
         if max_tokens is None:
             max_tokens = 1024
 
-        response = self.provider.get_client().messages.create(
+        # Mark the static system prompt as a cache breakpoint so repeat calls read it from the prompt cache
+        system_blocks = NOT_GIVEN
+        if system:
+            system_blocks = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+
+        return dict(
+            system=system_blocks,
             messages=[
                 {"role": "user", "content": prompt}
             ],
@@ -33,4 +78,114 @@ class AnthropicLLM(LLM):
             top_p=self.params.get('top_p', NOT_GIVEN),
         )
 
+    def _estimate_tokens(self, prompt: str, system: str = None) -> int:
+        # Providers count the requested output budget against the token limit up front
+        return estimate_tokens(prompt) + estimate_tokens(system or "") + (self.params.get('max_tokens') or 1024)
+
+    def _record_response_usage(self, usage, slot):
+        self.record_usage(usage.input_tokens, usage.output_tokens,
+                          getattr(usage, "cache_read_input_tokens", 0), getattr(usage, "cache_creation_input_tokens", 0))
+        # Cache writes count toward the input-token rate limit, cache reads don't
+        slot.actual_tokens = (usage.input_tokens + usage.output_tokens
+                              + (getattr(usage, "cache_creation_input_tokens", 0) or 0))
+
+    def _chat_kwargs(self, messages: list[dict], system: str, tools: list[dict], tool_choice: str) -> dict:
+        kwargs = self._request_kwargs("", system)
+        kwargs["messages"] = _message_params(messages)
+        if tools:
+            kwargs["tools"] = [{"name": tool["name"], "description": tool["description"],
+                                "input_schema": tool["parameters"]} for tool in tools]
+            kwargs["tool_choice"] = {"type": tool_choice}
+        return kwargs
+
+    def _reply(self, response) -> dict:
+        return {
+            "role": "assistant",
+            "content": "".join(block.text for block in response.content if block.type == "text"),
+            "tool_calls": [ToolCall(block.id, block.name, block.input)
+                           for block in response.content if block.type == "tool_use"],
+        }
+
+    def query(self, prompt: str, system: str = None) -> str:
+        with self._observe_call("anthropic"):
+            with self.provider.limiter.limit(self._estimate_tokens(prompt, system)) as slot:
+                response = self.provider.get_client().messages.create(**self._request_kwargs(prompt, system))
+                self._record_response_usage(response.usage, slot)
+
+        return response.content[0].text
+
+    async def aquery(self, prompt: str, system: str = None) -> str:
+        with self._observe_call("anthropic"):
+            async with self.provider.limiter.alimit(self._estimate_tokens(prompt, system)) as slot:
+                response = await self.provider.get_async_client().messages.create(**self._request_kwargs(prompt, system))
+                self._record_response_usage(response.usage, slot)
+
         return response.content[0].text
+
+    def chat(self, messages: list[dict], system: str = None, tools: list[dict] = None,
+             tool_choice: str = "auto") -> dict:
+        kwargs = self._chat_kwargs(messages, system, tools, tool_choice)
+        with self._observe_call("anthropic"):
+            with self.provider.limiter.limit(self._estimate_tokens(json.dumps(kwargs["messages"]), system)) as slot:
+                response = self.provider.get_client().messages.create(**kwargs)
+                self._record_response_usage(response.usage, slot)
+
+        return self._reply(response)
+
+    async def achat(self, messages: list[dict], system: str = None, tools: list[dict] = None,
+                    tool_choice: str = "auto") -> dict:
+        kwargs = self._chat_kwargs(messages, system, tools, tool_choice)
+        with self._observe_call("anthropic"):
+            async with self.provider.limiter.alimit(self._estimate_tokens(json.dumps(kwargs["messages"]), system)) as slot:
+                response = await self.provider.get_async_client().messages.create(**kwargs)
+                self._record_response_usage(response.usage, slot)
+
+        return self._reply(response)
+
+    def stream(self, prompt: str, system: str = None) -> Iterator[str]:
+        with self._observe_stream("anthropic"):
+            with self.provider.limiter.limit(self._estimate_tokens(prompt, system)) as slot:
+                with self.provider.get_client().messages.stream(**self._request_kwargs(prompt, system)) as stream:
+                    for text in stream.text_stream:
+                        yield text
+
+                    self._record_response_usage(stream.get_final_message().usage, slot)
+
+    async def astream(self, prompt: str, system: str = None) -> AsyncIterator[str]:
+        with self._observe_stream("anthropic"):
+            async with self.provider.limiter.alimit(self._estimate_tokens(prompt, system)) as slot:
+                client = self.provider.get_async_client()
+                async with client.messages.stream(**self._request_kwargs(prompt, system)) as stream:
+                    async for text in stream.text_stream:
+                        yield text
+
+                    self._record_response_usage((await stream.get_final_message()).usage, slot)
+
+    def submit_batch(self, requests: list[tuple[str, str, str]]) -> str:
+        batch = self.provider.get_client().messages.batches.create(requests=[
+            {
+                "custom_id": custom_id,
+                "params": {k: v for k, v in self._request_kwargs(prompt, system).items() if v is not NOT_GIVEN},
+            }
+            for custom_id, prompt, system in requests
+        ])
+        return batch.id
+
+    def collect_batch(self, batch_id: str, poll_interval: float = 30.0) -> dict[str, Any]:
+        batches = self.provider.get_client().messages.batches
+
+        while batches.retrieve(batch_id).processing_status != "ended":
+            time.sleep(poll_interval)
+
+        results = {}
+        for entry in batches.results(batch_id):
+            if entry.result.type != "succeeded":
+                results[entry.custom_id] = RuntimeError(f"Batch request {entry.custom_id} {entry.result.type}")
+                continue
+
+            message = entry.result.message
+            self.record_usage(message.usage.input_tokens, message.usage.output_tokens,
+                              message.usage.cache_read_input_tokens, message.usage.cache_creation_input_tokens)
+            results[entry.custom_id] = message.content[0].text
+
+        return results
@@ -0,0 +1,96 @@
+from typing import AsyncIterator, Iterator
+
+from modulus.core.resources.cache import Cache, MISS, make_key
+from modulus.core.resources.llm import LLM
+from modulus.core.tracing import current_span
+
+
+class CachedLLM(LLM):
+    """
+    Serve repeated prompts from a cache instead of calling the wrapped LLM.
+
+    Keys combine the provider type, model, normalized params, system prompt and the prompt, so two
+    [llm.<name>] blocks pointing at the same model with the same settings share entries.
+    """
+
+    def __init__(self, llm: LLM, cache: Cache):
+        super().__init__(getattr(llm, "provider", None), llm.get_model(), getattr(llm, "params", {}))
+        self.llm = llm
+        self.cache = cache
+        self.provider = getattr(llm, "provider", None)
+        self.params = getattr(llm, "params", {})
+        self.retryable_errors = llm.retryable_errors
+        self.provider_errors = llm.provider_errors
+
+    def get_model(self):
+        return self.llm.get_model()
+
+    def _key(self, prompt: str, system: str = None) -> str:
+        params = {k: v for k, v in self.params.items() if v is not None}
+        return make_key(type(self.provider).__name__, self.get_model(), params, system, prompt)
+
+    def query(self, prompt: str, system: str = None) -> str:
+        key = self._key(prompt, system)
+
+        result = self.cache.get(key)
+        current_span().set_attribute("llm.cache_hit", result is not MISS)
+        if result is MISS:
+            result = self.llm.query(prompt, system)
+            self.cache.set(key, result)
+
+        return result
+
+    async def aquery(self, prompt: str, system: str = None) -> str:
+        key = self._key(prompt, system)
+
+        result = await self.cache.aget(key)
+        current_span().set_attribute("llm.cache_hit", result is not MISS)
+        if result is MISS:
+            result = await self.llm.aquery(prompt, system)
+            await self.cache.aset(key, result)
+
+        return result
+
+    # Tool-calling turns depend on tool results and are not cached
+    def chat(self, messages: list[dict], system: str = None, tools: list[dict] = None,
+             tool_choice: str = "auto") -> dict:
+        return self.llm.chat(messages, system, tools, tool_choice)
+
+    async def achat(self, messages: list[dict], system: str = None, tools: list[dict] = None,
+                    tool_choice: str = "auto") -> dict:
+        return await self.llm.achat(messages, system, tools, tool_choice)
+
+    def stream(self, prompt: str, system: str = None) -> Iterator[str]:
+        key = self._key(prompt, system)
+
+        result = self.cache.get(key)
+        current_span().set_attribute("llm.cache_hit", result is not MISS)
+        if result is not MISS:
+            yield result
+            return
+
+        chunks = []
+        for chunk in self.llm.stream(prompt, system):
+            chunks.append(chunk)
+            yield chunk
+
+        self.cache.set(key, "".join(chunks))
+
+    async def astream(self, prompt: str, system: str = None) -> AsyncIterator[str]:
+        key = self._key(prompt, system)
+
+        result = await self.cache.aget(key)
+        current_span().set_attribute("llm.cache_hit", result is not MISS)
+        if result is not MISS:
+            yield result
+            return
+
+        chunks = []
+        async for chunk in self.llm.astream(prompt, system):
+            chunks.append(chunk)
+            yield chunk
+
+        await self.cache.aset(key, "".join(chunks))
+
+    def usage_stats(self) -> dict:
+        return self.llm.usage_stats()
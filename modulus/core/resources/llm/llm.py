@@ -1,17 +1,123 @@
+import threading
+
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Iterator, Union
 
 from modulus.core.resources.provider import Provider
+from modulus.core.metrics import track_llm_call
+from modulus.core.tracing import current_span, start_span
+
+
+@dataclass
+class ToolCall:
+    id: str
+    name: str
+    # Parsed JSON arguments, or the raw text when the model produced invalid JSON
+    arguments: Union[dict, str]
 
 
 class LLM(ABC):
+    # Exceptions worth retrying (connection failures, rate limits, server errors)
+    retryable_errors: tuple = ()
+    # Every error the provider's API answers with, status errors included (a router falls back on these)
+    provider_errors: tuple = ()
+    # Whether submit_batch/collect_batch use a provider batch API
+    supports_batch: bool = False
+
     def __init__(self, provider: Provider, model: str, params: dict = None):
-        pass
+        self.usage = {"input_tokens": 0, "output_tokens": 0, "cache_read_tokens": 0, "cache_write_tokens": 0}
+        self._usage_lock = threading.Lock()
 
     @abstractmethod
     def get_model(self):
         pass
 
     @abstractmethod
-    def query(self, prompt: str):
-        """Send a prompt and get a response."""
+    def query(self, prompt: str, system: str = None):
+        """
+        Send a prompt and get a response. `system` is a static instruction prefix that
+        providers can cache across calls.
+        """
         pass
+
+    @abstractmethod
+    async def aquery(self, prompt: str, system: str = None):
+        """Send a prompt and await the response without blocking the event loop."""
+        pass
+
+    def stream(self, prompt: str, system: str = None) -> Iterator[str]:
+        """Send a prompt and yield the response text as it is generated."""
+        yield self.query(prompt, system)
+
+    async def astream(self, prompt: str, system: str = None) -> AsyncIterator[str]:
+        """Async counterpart of `stream`."""
+        yield await self.aquery(prompt, system)
+
+    def chat(self, messages: list[dict], system: str = None, tools: list[dict] = None,
+             tool_choice: str = "auto") -> dict:
+        """
+        Send a conversation, with `tools` the model may call, and return its reply.
+
+        Messages are provider-neutral dicts, converted by each LLM:
+        - {"role": "user", "content": str}
+        - {"role": "assistant", "content": str, "tool_calls": [ToolCall, ...]} (what chat returns)
+        - {"role": "tool", "tool_call_id": str, "content": str, "is_error": bool}
+
+        Tools are {"name", "description", "parameters"} dicts with a JSON schema of the arguments.
+        `tool_choice` is "auto" or "none" (answer without calling tools).
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support tool calling")
+
+    async def achat(self, messages: list[dict], system: str = None, tools: list[dict] = None,
+                    tool_choice: str = "auto") -> dict:
+        """Async counterpart of `chat`."""
+        raise NotImplementedError(f"{type(self).__name__} does not support tool calling")
+
+    def submit_batch(self, requests: list[tuple[str, str, str]]) -> str:
+        """
+        Submit (custom_id, prompt, system) requests to the provider's batch API and return the batch id.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support provider batch requests")
+
+    def collect_batch(self, batch_id: str, poll_interval: float = 30.0) -> dict[str, Any]:
+        """
+        Wait for a submitted batch to end and return custom_id -> output text, or the Exception of a failed request.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support provider batch requests")
+
+    @contextmanager
+    def _observe_call(self, provider: str):
+        """
+        Trace and time one provider call made by a concrete LLM.
+        """
+        model = self.get_model()
+        with start_span("llm.query", kind="client", **{"llm.provider": provider, "llm.model": model}), \
+                track_llm_call(provider, model):
+            yield
+
+    def _observe_stream(self, provider: str):
+        """
+        Time one streamed provider call, up to its last chunk. Streams get no span: a generator can be
+        resumed in a different context than the one it started in, where the span couldn't be reset.
+        """
+        return track_llm_call(provider, self.get_model())
+
+    def record_usage(self, input_tokens: int = 0, output_tokens: int = 0,
+                     cache_read_tokens: int = 0, cache_write_tokens: int = 0):
+        with self._usage_lock:
+            self.usage["input_tokens"] += input_tokens or 0
+            self.usage["output_tokens"] += output_tokens or 0
+            self.usage["cache_read_tokens"] += cache_read_tokens or 0
+            self.usage["cache_write_tokens"] += cache_write_tokens or 0
+
+        span = current_span()
+        span.add_to_attribute("llm.prompt_tokens", input_tokens or 0)
+        span.add_to_attribute("llm.completion_tokens", output_tokens or 0)
+        span.add_to_attribute("llm.cache_read_tokens", cache_read_tokens or 0)
+        span.add_to_attribute("llm.cache_write_tokens", cache_write_tokens or 0)
+
+    def usage_stats(self) -> dict:
+        with self._usage_lock:
+            return dict(self.usage)
@@ -0,0 +1,131 @@
+import asyncio
+import json
+import time
+
+from typing import AsyncIterator, Iterator
+
+from modulus.core.resources.provider import MockProvider, MockProviderError
+from modulus.core.resources.llm import LLM, ToolCall
+from modulus.core.util import estimate_tokens
+
+
+# Placeholder argument for each JSON schema type
+PLACEHOLDERS = {"string": "", "integer": 0, "number": 0.0, "boolean": False, "array": [], "object": {}}
+
+
+class MockLLM(LLM):
+    """
+    LLM served by a MockProvider: sleeps for the sampled latency and generation time instead of
+    calling an API, and answers with `output_tokens` placeholder words.
+
+    In conversations with tools, the first turn calls the tools (see MockProvider `tool_calls`)
+    with placeholder arguments and the next one answers.
+    """
+
+    retryable_errors = (MockProviderError,)
+    provider_errors = (MockProviderError,)
+
+    def __init__(self, provider: MockProvider, model: str, params: dict = {}):
+        super().__init__(provider, model, params)
+        self.model = model
+        self.provider = provider
+        self.params = params
+
+    def get_model(self):
+        return self.model
+
+    def _output_tokens(self) -> int:
+        return self.params.get('max_tokens') or self.provider.output_tokens
+
+    def _tokens(self) -> list[str]:
+        return [f"token{i}" for i in range(self._output_tokens())]
+
+    def _check_failure(self):
+        if self.provider.sample_failure():
+            raise MockProviderError(f"Injected failure from mock model {self.model}")
+
+    def _record(self, prompt: str, system: str, slot):
+        input_tokens = estimate_tokens(prompt) + estimate_tokens(system or "")
+        self.record_usage(input_tokens, self._output_tokens())
+        slot.actual_tokens = input_tokens + self._output_tokens()
+
+    def _estimate_tokens(self, prompt: str, system: str = None) -> int:
+        return estimate_tokens(prompt) + estimate_tokens(system or "") + self._output_tokens()
+
+    def query(self, prompt: str, system: str = None) -> str:
+        with self._observe_call("mock"):
+            with self.provider.limiter.limit(self._estimate_tokens(prompt, system)) as slot:
+                time.sleep(self.provider.sample_latency() + self._output_tokens() * self.provider.token_delay())
+                self._check_failure()
+                self._record(prompt, system, slot)
+
+        return " ".join(self._tokens())
+
+    async def aquery(self, prompt: str, system: str = None) -> str:
+        with self._observe_call("mock"):
+            async with self.provider.limiter.alimit(self._estimate_tokens(prompt, system)) as slot:
+                await asyncio.sleep(self.provider.sample_latency() + self._output_tokens() * self.provider.token_delay())
+                self._check_failure()
+                self._record(prompt, system, slot)
+
+        return " ".join(self._tokens())
+
+    def _reply(self, messages: list[dict], tools: list[dict], tool_choice: str) -> dict:
+        if not tools or tool_choice == "none" or any(message["role"] == "tool" for message in messages):
+            return {"role": "assistant", "content": " ".join(self._tokens()), "tool_calls": []}
+
+        count = len(tools) if self.provider.tool_calls is None else self.provider.tool_calls
+        calls = []
+        for n in range(count):
+            tool = tools[n % len(tools)]
+            arguments = {name: PLACEHOLDERS.get(schema.get("type"))
+                         for name, schema in tool["parameters"].get("properties", {}).items()}
+            calls.append(ToolCall(f"call_{n}", tool["name"], arguments))
+
+        return {"role": "assistant", "content": "" if calls else " ".join(self._tokens()), "tool_calls": calls}
+
+    def chat(self, messages: list[dict], system: str = None, tools: list[dict] = None,
+             tool_choice: str = "auto") -> dict:
+        prompt = json.dumps(messages, default=str)
+        with self._observe_call("mock"):
+            with self.provider.limiter.limit(self._estimate_tokens(prompt, system)) as slot:
+                time.sleep(self.provider.sample_latency() + self._output_tokens() * self.provider.token_delay())
+                self._check_failure()
+                self._record(prompt, system, slot)
+
+        return self._reply(messages, tools, tool_choice)
+
+    async def achat(self, messages: list[dict], system: str = None, tools: list[dict] = None,
+                    tool_choice: str = "auto") -> dict:
+        prompt = json.dumps(messages, default=str)
+        with self._observe_call("mock"):
+            async with self.provider.limiter.alimit(self._estimate_tokens(prompt, system)) as slot:
+                await asyncio.sleep(self.provider.sample_latency() + self._output_tokens() * self.provider.token_delay())
+                self._check_failure()
+                self._record(prompt, system, slot)
+
+        return self._reply(messages, tools, tool_choice)
+
+    def stream(self, prompt: str, system: str = None) -> Iterator[str]:
+        with self._observe_stream("mock"):
+            with self.provider.limiter.limit(self._estimate_tokens(prompt, system)) as slot:
+                time.sleep(self.provider.sample_latency())
+                self._check_failure()
+
+                for i, token in enumerate(self._tokens()):
+                    time.sleep(self.provider.token_delay())
+                    yield token if i == 0 else " " + token
+
+                self._record(prompt, system, slot)
+
+    async def astream(self, prompt: str, system: str = None) -> AsyncIterator[str]:
+        with self._observe_stream("mock"):
+            async with self.provider.limiter.alimit(self._estimate_tokens(prompt, system)) as slot:
+                await asyncio.sleep(self.provider.sample_latency())
+                self._check_failure()
+
+                for i, token in enumerate(self._tokens()):
+                    await asyncio.sleep(self.provider.token_delay())
+                    yield token if i == 0 else " " + token
+
+                self._record(prompt, system, slot)
@@ -1,9 +1,49 @@
+import json
+import time
+
+from typing import Any, AsyncIterator, Iterator
+
+import openai
+
 from openai import NOT_GIVEN
 
 from modulus.core.resources.provider import OpenAIProvider
-from modulus.core.resources.llm import LLM
+from modulus.core.resources.llm import LLM, ToolCall
+from modulus.core.util import estimate_tokens
+
+
+def _input_items(messages: list[dict]) -> list[dict]:
+    """
+    Convert neutral chat messages to Responses API input items.
+    """
+    items = []
+    for message in messages:
+        if message["role"] == "user":
+            items.append({"role": "user", "content": message["content"]})
+        elif message["role"] == "assistant":
+            if message.get("content"):
+                items.append({"role": "assistant", "content": message["content"]})
+            for call in message.get("tool_calls", []):
+                arguments = call.arguments if isinstance(call.arguments, str) else json.dumps(call.arguments)
+                items.append({"type": "function_call", "call_id": call.id, "name": call.name, "arguments": arguments})
+        elif message["role"] == "tool":
+            items.append({"type": "function_call_output", "call_id": message["tool_call_id"],
+                          "output": message["content"]})
+    return items
+
+
+def _parse_arguments(arguments: str):
+    try:
+        return json.loads(arguments or "{}")
+    except ValueError:
+        return arguments
+
 
 class OpenAILLM(LLM):
+    retryable_errors = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+    provider_errors = (openai.APIError,)
+    supports_batch = True
+
     def __init__(self, provider: OpenAIProvider, model: str, params: dict = {}):
         super().__init__(provider, model, params)
         self.model = model
@@ -13,14 +53,139 @@ class OpenAILLM(LLM):
     def get_model(self):
         return self.model
 
-    def query(self, prompt: str) -> str:
-        response = self.provider.get_client().responses.create(
+    def _request_kwargs(self, prompt: str, system: str = None) -> dict:
+        # Static instructions go first so OpenAI's automatic prefix caching can reuse them
+        return dict(
             input=prompt,
+            instructions=system if system else NOT_GIVEN,
             model=self.model,
             # temperature=self.params.get('temperature', NOT_GIVEN),
             max_output_tokens=self.params.get('max_tokens', NOT_GIVEN),
             top_p=self.params.get('top_p', NOT_GIVEN),
         )
 
+    def _estimate_tokens(self, prompt: str, system: str = None) -> int:
+        # Providers count the requested output budget against the token limit up front
+        return estimate_tokens(prompt) + estimate_tokens(system or "") + (self.params.get('max_tokens') or 0)
+
+    def _record_response_usage(self, usage, slot):
+        details = getattr(usage, "input_tokens_details", None)
+        self.record_usage(usage.input_tokens, usage.output_tokens, getattr(details, "cached_tokens", 0))
+        slot.actual_tokens = usage.total_tokens
+
+    def _chat_kwargs(self, messages: list[dict], system: str, tools: list[dict], tool_choice: str) -> dict:
+        kwargs = self._request_kwargs(_input_items(messages), system)
+        if tools:
+            kwargs["tools"] = [{"type": "function", "name": tool["name"], "description": tool["description"],
+                                "parameters": tool["parameters"]} for tool in tools]
+            kwargs["tool_choice"] = tool_choice
+        return kwargs
+
+    def _reply(self, response) -> dict:
+        calls = [ToolCall(item.call_id, item.name, _parse_arguments(item.arguments))
+                 for item in response.output if item.type == "function_call"]
+        return {"role": "assistant", "content": response.output_text, "tool_calls": calls}
+
+    def query(self, prompt: str, system: str = None) -> str:
+        with self._observe_call("openai"):
+            with self.provider.limiter.limit(self._estimate_tokens(prompt, system)) as slot:
+                response = self.provider.get_client().responses.create(**self._request_kwargs(prompt, system))
+                self._record_response_usage(response.usage, slot)
+
+        return response.output_text
+
+    async def aquery(self, prompt: str, system: str = None) -> str:
+        with self._observe_call("openai"):
+            async with self.provider.limiter.alimit(self._estimate_tokens(prompt, system)) as slot:
+                response = await self.provider.get_async_client().responses.create(**self._request_kwargs(prompt, system))
+                self._record_response_usage(response.usage, slot)
+
         return response.output_text
 
+    def chat(self, messages: list[dict], system: str = None, tools: list[dict] = None,
+             tool_choice: str = "auto") -> dict:
+        kwargs = self._chat_kwargs(messages, system, tools, tool_choice)
+        with self._observe_call("openai"):
+            with self.provider.limiter.limit(self._estimate_tokens(json.dumps(kwargs["input"]), system)) as slot:
+                response = self.provider.get_client().responses.create(**kwargs)
+                self._record_response_usage(response.usage, slot)
+
+        return self._reply(response)
+
+    async def achat(self, messages: list[dict], system: str = None, tools: list[dict] = None,
+                    tool_choice: str = "auto") -> dict:
+        kwargs = self._chat_kwargs(messages, system, tools, tool_choice)
+        with self._observe_call("openai"):
+            async with self.provider.limiter.alimit(self._estimate_tokens(json.dumps(kwargs["input"]), system)) as slot:
+                response = await self.provider.get_async_client().responses.create(**kwargs)
+                self._record_response_usage(response.usage, slot)
+
+        return self._reply(response)
+
+    def stream(self, prompt: str, system: str = None) -> Iterator[str]:
+        with self._observe_stream("openai"):
+            with self.provider.limiter.limit(self._estimate_tokens(prompt, system)) as slot:
+                events = self.provider.get_client().responses.create(
+                    **self._request_kwargs(prompt, system), stream=True
+                )
+
+                for event in events:
+                    if event.type == "response.output_text.delta":
+                        yield event.delta
+                    elif event.type == "response.completed":
+                        self._record_response_usage(event.response.usage, slot)
+
+    async def astream(self, prompt: str, system: str = None) -> AsyncIterator[str]:
+        with self._observe_stream("openai"):
+            async with self.provider.limiter.alimit(self._estimate_tokens(prompt, system)) as slot:
+                events = await self.provider.get_async_client().responses.create(
+                    **self._request_kwargs(prompt, system), stream=True
+                )
+
+                async for event in events:
+                    if event.type == "response.output_text.delta":
+                        yield event.delta
+                    elif event.type == "response.completed":
+                        self._record_response_usage(event.response.usage, slot)
+
+    def submit_batch(self, requests: list[tuple[str, str, str]]) -> str:
+        lines = []
+        for custom_id, prompt, system in requests:
+            body = {k: v for k, v in self._request_kwargs(prompt, system).items() if v is not NOT_GIVEN}
+            lines.append(json.dumps({"custom_id": custom_id, "method": "POST", "url": "/v1/responses", "body": body}))
+
+        client = self.provider.get_client()
+        batch_file = client.files.create(file=("batch.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch")
+        batch = client.batches.create(input_file_id=batch_file.id, endpoint="/v1/responses", completion_window="24h")
+        return batch.id
+
+    def collect_batch(self, batch_id: str, poll_interval: float = 30.0) -> dict[str, Any]:
+        client = self.provider.get_client()
+
+        batch = client.batches.retrieve(batch_id)
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            time.sleep(poll_interval)
+            batch = client.batches.retrieve(batch_id)
+
+        results = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if file_id is None:
+                continue
+
+            for line in client.files.content(file_id).text.splitlines():
+                entry = json.loads(line)
+                response = entry.get("response") or {}
+                if response.get("status_code") != 200:
+                    results[entry["custom_id"]] = RuntimeError(json.dumps(entry.get("error") or response.get("body")))
+                    continue
+
+                body = response["body"]
+                usage = body.get("usage") or {}
+                self.record_usage(usage.get("input_tokens"), usage.get("output_tokens"),
+                                  (usage.get("input_tokens_details") or {}).get("cached_tokens"))
+                results[entry["custom_id"]] = "".join(
+                    part["text"] for item in body["output"] if item["type"] == "message"
+                    for part in item["content"] if part["type"] == "output_text"
+                )
+
+        return results
@@ -0,0 +1,239 @@
+import asyncio
+import contextvars
+import random
+import threading
+import time
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import AsyncIterator, Iterator, Optional
+
+from modulus.core.resources.llm import LLM
+from modulus.core.tracing import current_span
+
+
+class ResilientLLM(LLM):
+    """
+    Retry and hedge calls to the wrapped LLM.
+
+    - Retryable errors (the wrapped LLM's `retryable_errors`, plus attempt timeouts) are retried up to
+      `retries` times with full-jitter exponential backoff: sleep ~ U(0, min(backoff_max, backoff * 2^n)).
+    - `attempt_timeout` bounds each attempt.
+    - With `hedge`, a duplicate request is fired if the first hasn't answered after `hedge_delay`
+      seconds (default: the observed p95 latency) and whichever answers first wins.
+
+    Streams are retried only until their first chunk is yielded, and are never hedged.
+    """
+
+    def __init__(self, llm: LLM, retries: int = 2, backoff: float = 0.5, backoff_max: float = 30.0,
+                 attempt_timeout: Optional[float] = None, hedge: bool = False, hedge_delay: Optional[float] = None):
+        super().__init__(getattr(llm, "provider", None), llm.get_model(), getattr(llm, "params", {}))
+        self.llm = llm
+        self.provider = getattr(llm, "provider", None)
+        self.params = getattr(llm, "params", {})
+        self.retryable_errors = llm.retryable_errors + (TimeoutError, asyncio.TimeoutError)
+        self.provider_errors = llm.provider_errors
+
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.attempt_timeout = attempt_timeout
+        self.hedge = hedge
+        self.hedge_delay = hedge_delay
+
+        self._latencies = deque(maxlen=200)
+        self._stats_lock = threading.Lock()
+        self.counts = {"calls": 0, "attempts": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "failures": 0}
+        self._pool = None
+
+    def get_model(self):
+        return self.llm.get_model()
+
+    def _count(self, name: str, amount: int = 1):
+        with self._stats_lock:
+            self.counts[name] += amount
+
+        if name in ("retries", "hedges"):
+            current_span().add_to_attribute(f"llm.{name}", amount)
+
+    def _observe(self, started: float):
+        with self._stats_lock:
+            self._latencies.append(time.monotonic() - started)
+
+    def _current_hedge_delay(self) -> Optional[float]:
+        if not self.hedge:
+            return None
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+
+        with self._stats_lock:
+            if len(self._latencies) < 20:
+                return None
+            latencies = sorted(self._latencies)
+        return latencies[int(0.95 * (len(latencies) - 1))]
+
+    def _sleep_time(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff * (2 ** attempt)))
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(thread_name_prefix=f"modulus-{self.get_model()}")
+        return self._pool
+
+    def _attempt(self, call, *args):
+        self._count("attempts")
+        delay = self._current_hedge_delay()
+
+        if self.attempt_timeout is None and delay is None:
+            return call(*args)
+
+        # Threads let us enforce the deadline and hedge; a timed-out thread finishes in the background.
+        # Each runs in a copy of the caller's context so its spans stay in the caller's trace.
+        started = time.monotonic()
+        futures = [self._executor().submit(contextvars.copy_context().run, call, *args)]
+
+        if delay is not None:
+            done, _ = wait(futures, timeout=delay)
+            if not done:
+                self._count("hedges")
+                futures.append(self._executor().submit(contextvars.copy_context().run, call, *args))
+
+        deadline = None if self.attempt_timeout is None else started + self.attempt_timeout
+        pending = set(futures)
+        while pending:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                raise TimeoutError(f"LLM {self.get_model()} attempt exceeded {self.attempt_timeout}s")
+
+            for future in done:
+                if future.exception() is None:
+                    if future is not futures[0]:
+                        self._count("hedge_wins")
+                    return future.result()
+
+            if not pending:
+                raise futures[-1].exception()
+
+    async def _aattempt(self, call, *args):
+        self._count("attempts")
+        delay = self._current_hedge_delay()
+
+        tasks = [asyncio.ensure_future(call(*args))]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    self._count("hedges")
+                    tasks.append(asyncio.ensure_future(call(*args)))
+
+            pending = set(tasks)
+            deadline = None if self.attempt_timeout is None else time.monotonic() + self.attempt_timeout
+            error = None
+
+            while pending:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    raise TimeoutError(f"LLM {self.get_model()} attempt exceeded {self.attempt_timeout}s")
+
+                for task in done:
+                    if task.exception() is None:
+                        if task is not tasks[0]:
+                            self._count("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _call(self, call, *args):
+        self._count("calls")
+
+        for attempt in range(self.retries + 1):
+            started = time.monotonic()
+            try:
+                result = self._attempt(call, *args)
+                self._observe(started)
+                return result
+            except self.retryable_errors:
+                if attempt == self.retries:
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                time.sleep(self._sleep_time(attempt))
+
+    async def _acall(self, call, *args):
+        self._count("calls")
+
+        for attempt in range(self.retries + 1):
+            started = time.monotonic()
+            try:
+                result = await self._aattempt(call, *args)
+                self._observe(started)
+                return result
+            except self.retryable_errors:
+                if attempt == self.retries:
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                await asyncio.sleep(self._sleep_time(attempt))
+
+    def query(self, prompt: str, system: str = None) -> str:
+        return self._call(self.llm.query, prompt, system)
+
+    async def aquery(self, prompt: str, system: str = None) -> str:
+        return await self._acall(self.llm.aquery, prompt, system)
+
+    def chat(self, messages: list[dict], system: str = None, tools: list[dict] = None,
+             tool_choice: str = "auto") -> dict:
+        return self._call(self.llm.chat, messages, system, tools, tool_choice)
+
+    async def achat(self, messages: list[dict], system: str = None, tools: list[dict] = None,
+                    tool_choice: str = "auto") -> dict:
+        return await self._acall(self.llm.achat, messages, system, tools, tool_choice)
+
+    def stream(self, prompt: str, system: str = None) -> Iterator[str]:
+        self._count("calls")
+
+        for attempt in range(self.retries + 1):
+            self._count("attempts")
+            started = False
+            try:
+                for chunk in self.llm.stream(prompt, system):
+                    started = True
+                    yield chunk
+                return
+            except self.retryable_errors:
+                if started or attempt == self.retries:
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                time.sleep(self._sleep_time(attempt))
+
+    async def astream(self, prompt: str, system: str = None) -> AsyncIterator[str]:
+        self._count("calls")
+
+        for attempt in range(self.retries + 1):
+            self._count("attempts")
+            started = False
+            try:
+                async for chunk in self.llm.astream(prompt, system):
+                    started = True
+                    yield chunk
+                return
+            except self.retryable_errors:
+                if started or attempt == self.retries:
+                    self._count("failures")
+                    raise
+                self._count("retries")
+                await asyncio.sleep(self._sleep_time(attempt))
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return dict(self.counts)
+
+    def usage_stats(self) -> dict:
+        return self.llm.usage_stats()
@@ -0,0 +1,228 @@
+import random
+import statistics
+import threading
+import time
+
+from collections import deque
+from typing import AsyncIterator, Iterator, List, Optional
+
+from modulus.core.resources.llm import LLM
+from modulus.core.tracing import current_span
+
+
+class BackendStats:
+    """
+    Rolling latency and error statistics for one routed LLM.
+
+    After `failure_threshold` consecutive failures the backend is considered unhealthy for
+    `cooldown` seconds and is only tried once every healthy backend has failed.
+    """
+
+    def __init__(self, window: int = 100, failure_threshold: int = 3, cooldown: float = 30.0):
+        self.latencies = deque(maxlen=window)
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+    def record_success(self, latency: float):
+        self.calls += 1
+        self.latencies.append(latency)
+        self.error_rate *= 0.9
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        self.calls += 1
+        self.failures += 1
+        self.error_rate = 0.9 * self.error_rate + 0.1
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= self.failure_threshold:
+            self.unhealthy_until = time.monotonic() + self.cooldown
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    @property
+    def p50(self) -> float:
+        # Backends without samples sort first so every backend gets measured
+        return statistics.median(self.latencies) if self.latencies else 0.0
+
+    def snapshot(self) -> dict:
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "error_rate": self.error_rate,
+            "p50": self.p50,
+            "healthy": self.healthy,
+        }
+
+
+class RouterLLM(LLM):
+    """
+    Route each call across several configured LLMs, falling back to the next one on failure.
+
+    Policies decide the order backends are tried in:
+    - "fallback": configured order (primary first)
+    - "latency": lowest observed p50 latency first
+    - "weighted": one backend drawn at random by `weights` (scaled down by its error rate), then the rest
+
+    Unhealthy backends (see BackendStats) always go last. Only the backends' retryable and provider
+    errors fall back; any other exception is raised immediately and doesn't count against the backend.
+    """
+
+    POLICIES = ("fallback", "latency", "weighted")
+
+    def __init__(self, backends: List[LLM], names: List[str], policy: str = "fallback",
+                 weights: Optional[List[float]] = None, failure_threshold: int = 3, cooldown: float = 30.0):
+        super().__init__(None, None)
+        if policy not in self.POLICIES:
+            raise ValueError(f"Router policy `{policy}` is not supported")
+        if not backends:
+            raise ValueError("Router needs at least one backend")
+
+        self.backends = backends
+        self.names = names
+        self.policy = policy
+        self.weights = weights or [1.0] * len(backends)
+        self.provider = None
+        self.params = {}
+        self.retryable_errors = tuple({error for backend in backends for error in backend.retryable_errors})
+        self.provider_errors = tuple({error for backend in backends for error in backend.provider_errors})
+        # Anything else (a bug, a bad request built by the caller) is raised at once instead of falling back
+        self.fallback_errors = self.retryable_errors + self.provider_errors
+
+        self.backend_stats = [BackendStats(failure_threshold=failure_threshold, cooldown=cooldown)
+                              for _ in backends]
+        self._lock = threading.Lock()
+
+    def get_model(self):
+        return "|".join(backend.get_model() for backend in self.backends)
+
+    def _order(self) -> List[int]:
+        indices = list(range(len(self.backends)))
+
+        with self._lock:
+            if self.policy == "latency":
+                indices.sort(key=lambda i: self.backend_stats[i].p50)
+            elif self.policy == "weighted":
+                weights = [self.weights[i] * (1.0 - self.backend_stats[i].error_rate) for i in indices]
+                if sum(weights) > 0:
+                    first = random.choices(indices, weights=weights)[0]
+                    indices.remove(first)
+                    indices.insert(0, first)
+
+            # Stable sort keeps the policy order within healthy and unhealthy groups
+            indices.sort(key=lambda i: not self.backend_stats[i].healthy)
+
+        return indices
+
+    def _record(self, i: int, started: Optional[float]):
+        with self._lock:
+            if started is None:
+                self.backend_stats[i].record_failure()
+            else:
+                self.backend_stats[i].record_success(time.monotonic() - started)
+
+        span = current_span()
+        if started is None:
+            span.add_to_attribute("llm.fallbacks", 1)
+        else:
+            span.set_attribute("llm.route", self.names[i])
+
+    def _route(self, method: str, *args):
+        error = None
+        for i in self._order():
+            started = time.monotonic()
+            try:
+                result = getattr(self.backends[i], method)(*args)
+            except self.fallback_errors as e:
+                self._record(i, None)
+                error = e
+                continue
+            self._record(i, started)
+            return result
+        raise error
+
+    async def _aroute(self, method: str, *args):
+        error = None
+        for i in self._order():
+            started = time.monotonic()
+            try:
+                result = await getattr(self.backends[i], method)(*args)
+            except self.fallback_errors as e:
+                self._record(i, None)
+                error = e
+                continue
+            self._record(i, started)
+            return result
+        raise error
+
+    def query(self, prompt: str, system: str = None) -> str:
+        return self._route("query", prompt, system)
+
+    async def aquery(self, prompt: str, system: str = None) -> str:
+        return await self._aroute("aquery", prompt, system)
+
+    # Chat messages are provider-neutral, so a conversation can fall back to another provider mid-way
+    def chat(self, messages: list[dict], system: str = None, tools: list[dict] = None,
+             tool_choice: str = "auto") -> dict:
+        return self._route("chat", messages, system, tools, tool_choice)
+
+    async def achat(self, messages: list[dict], system: str = None, tools: list[dict] = None,
+                    tool_choice: str = "auto") -> dict:
+        return await self._aroute("achat", messages, system, tools, tool_choice)
+
+    def stream(self, prompt: str, system: str = None) -> Iterator[str]:
+        error = None
+        for i in self._order():
+            started = time.monotonic()
+            yielded = False
+            try:
+                for chunk in self.backends[i].stream(prompt, system):
+                    yielded = True
+                    yield chunk
+            except self.fallback_errors as e:
+                self._record(i, None)
+                # Output already sent can't be retracted, so only fall back before the first chunk
+                if yielded:
+                    raise
+                error = e
+                continue
+            self._record(i, started)
+            return
+        raise error
+
+    async def astream(self, prompt: str, system: str = None) -> AsyncIterator[str]:
+        error = None
+        for i in self._order():
+            started = time.monotonic()
+            yielded = False
+            try:
+                async for chunk in self.backends[i].astream(prompt, system):
+                    yielded = True
+                    yield chunk
+            except self.fallback_errors as e:
+                self._record(i, None)
+                # Output already sent can't be retracted, so only fall back before the first chunk
+                if yielded:
+                    raise
+                error = e
+                continue
+            self._record(i, started)
+            return
+        raise error
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {name: stats.snapshot() for name, stats in zip(self.names, self.backend_stats)}
+
+    def usage_stats(self) -> dict:
+        usage = dict.fromkeys(self.usage, 0)
+        for backend in self.backends:
+            for name, value in backend.usage_stats().items():
+                usage[name] += value
+        return usage
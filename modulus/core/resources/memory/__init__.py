@@ -1 +1,4 @@
-from .memory import Memory
\ No newline at end of file
+from .memory import Memory
+from .index import VectorIndex, FlatIndex, IVFIndex
+from .local import LocalMemory
+from .persistent import PersistentMemory
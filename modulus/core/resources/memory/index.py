@@ -0,0 +1,195 @@
+import os
+
+import numpy as np
+
+from abc import ABC, abstractmethod
+from typing import List
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices of the k highest scores along the last axis, best first.
+    Uses argpartition so only the k winners get sorted.
+    """
+    n = scores.shape[-1]
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.int64)
+
+    if k < n:
+        candidates = np.argpartition(-scores, k - 1, axis=-1)[..., :k]
+    else:
+        candidates = np.broadcast_to(np.arange(n), scores.shape)
+
+    order = np.argsort(-np.take_along_axis(scores, candidates, axis=-1), axis=-1)
+    return np.take_along_axis(candidates, order, axis=-1)
+
+
+class VectorIndex(ABC):
+    """
+    Search structure over the rows of a memory's normalized embedding matrix.
+    The matrix itself is owned by the memory; indexes only keep row ids and their own state.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    @abstractmethod
+    def add(self, matrix: np.ndarray, start: int, end: int) -> None:
+        """Index rows [start, end) of `matrix`."""
+        pass
+
+    @abstractmethod
+    def search(self, matrix: np.ndarray, queries: np.ndarray, k: int) -> List[np.ndarray]:
+        """Return, for each normalized query row, the ids of the k best matching rows, best first."""
+        pass
+
+    def save(self, path: str) -> None:
+        pass
+
+    def load(self, path: str) -> None:
+        pass
+
+
+class FlatIndex(VectorIndex):
+    """
+    Exact brute-force search: one matrix product over every row.
+    """
+
+    def add(self, matrix: np.ndarray, start: int, end: int) -> None:
+        self.count = end
+
+    def search(self, matrix: np.ndarray, queries: np.ndarray, k: int) -> List[np.ndarray]:
+        return list(top_k_indices(queries @ matrix[:self.count].T, k))
+
+
+class IVFIndex(VectorIndex):
+    """
+    Inverted file index. Rows are bucketed by their nearest of `nlist` centroids (trained with
+    spherical k-means), and a query only scores the rows in its `nprobe` closest buckets.
+    Raising nprobe trades latency for recall; nprobe = nlist is exact search.
+
+    Until `train_size` rows exist the index falls back to flat search, then trains once on a
+    sample and assigns new rows incrementally. Call `train` again after large distribution shifts.
+
+    Writes happen under the memory's lock while searches run concurrently, so buckets are
+    copy-on-write lists of id chunks and searches drop ids past the matrix snapshot they were given.
+    """
+
+    # Chunks a bucket may accumulate from incremental adds before they are merged
+    max_chunks = 8
+
+    def __init__(self, nlist: int = 256, nprobe: int = 8, train_size: int = None, seed: int = 0):
+        super().__init__()
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_size = train_size or nlist * 39
+        self.seed = seed
+        self.centroids = None
+        self._lists: List[List[np.ndarray]] = []
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    def _assign(self, vectors: np.ndarray, centroids: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        assignments = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk_size):
+            chunk = np.asarray(vectors[start:start + chunk_size])
+            assignments[start:start + chunk_size] = np.argmax(chunk @ centroids.T, axis=1)
+        return assignments
+
+    def _bucket(self, lists: List[List[np.ndarray]], ids: np.ndarray, assignments: np.ndarray) -> None:
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(len(lists) + 1))
+        for c in range(len(lists)):
+            if bounds[c + 1] > bounds[c]:
+                chunks = [*lists[c], ids[order[bounds[c]:bounds[c + 1]]]]
+                if len(chunks) > self.max_chunks:
+                    chunks = [np.concatenate(chunks)]
+                lists[c] = chunks
+
+    def _list(self, c: int) -> np.ndarray:
+        chunks = self._lists[c]
+        if len(chunks) == 1:
+            return chunks[0]
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.int64)
+
+    def train(self, matrix: np.ndarray, iterations: int = 20) -> None:
+        rng = np.random.default_rng(self.seed)
+        n = self.count
+        nlist = min(self.nlist, n)
+
+        sample_ids = rng.choice(n, size=min(n, self.nlist * 256), replace=False)
+        sample = np.asarray(matrix[np.sort(sample_ids)], dtype=np.float32)
+        centroids = sample[rng.choice(len(sample), size=nlist, replace=False)]
+
+        for _ in range(iterations):
+            assignments = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignments, sample)
+            empty = np.bincount(assignments, minlength=nlist) == 0
+            # Reseed empty clusters from random samples rather than letting them collapse
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            centroids = normalize_rows(sums)
+
+        centroids = centroids.astype(np.float32)
+        lists = [[] for _ in range(nlist)]
+        self._bucket(lists, np.arange(n), self._assign(matrix[:n], centroids))
+
+        # Searches read the centroids first, so the matching buckets must already be in place
+        self._lists = lists
+        self.nlist = nlist
+        self.centroids = centroids
+
+    def add(self, matrix: np.ndarray, start: int, end: int) -> None:
+        self.count = end
+
+        if self.trained:
+            self._bucket(self._lists, np.arange(start, end), self._assign(matrix[start:end], self.centroids))
+        elif end >= self.train_size:
+            self.train(matrix)
+
+    def search(self, matrix: np.ndarray, queries: np.ndarray, k: int) -> List[np.ndarray]:
+        if not self.trained:
+            return list(top_k_indices(queries @ matrix[:self.count].T, k))
+
+        probes = top_k_indices(queries @ self.centroids.T, self.nprobe)
+        results = []
+
+        for query, probe in zip(queries, probes):
+            ids = np.concatenate([self._list(c) for c in probe])
+            # Rows added after the caller took its matrix snapshot
+            ids = ids[ids < len(matrix)]
+            scores = np.asarray(matrix[ids]) @ query
+            results.append(ids[top_k_indices(scores, k)])
+
+        return results
+
+    def save(self, path: str) -> None:
+        if not self.trained:
+            return
+
+        lists = [self._list(c) for c in range(self.nlist)]
+        tmp_path = path + ".tmp.npz"
+        np.savez(tmp_path, centroids=self.centroids, ids=np.concatenate(lists),
+                 offsets=np.cumsum([0] + [len(ids) for ids in lists]), count=self.count)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> None:
+        if not os.path.isfile(path):
+            return
+
+        with np.load(path) as saved:
+            self.centroids = saved["centroids"]
+            ids, offsets = saved["ids"], saved["offsets"]
+            self.count = int(saved["count"])
+
+        self.nlist = len(self.centroids)
+        self._lists = [[ids[offsets[c]:offsets[c + 1]]] for c in range(self.nlist)]
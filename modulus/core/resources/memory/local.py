@@ -1,30 +1,165 @@
+import threading
+
 import numpy as np
 
-from typing import List, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, Any, Optional, Union
 
 from modulus.core.resources.memory import Memory
 from modulus.core.resources.embedding import EmbeddingModel
+from modulus.core.resources.memory.index import VectorIndex, FlatIndex, normalize_rows
+from modulus.core.metrics import MEMORY_QUERY_DURATION
+from modulus.core.tracing import start_span
+
+
+def _matches(metadata: dict, filters: dict) -> bool:
+    for key, accepted in filters.items():
+        value = metadata.get(key)
+        if value != accepted and not (isinstance(accepted, list) and value in accepted):
+            return False
+    return True
 
 
 class LocalMemory(Memory):
-    def __init__(self, embedder: EmbeddingModel):
+    """
+    In-process vector store. Embeddings are kept L2-normalized in one contiguous float32 matrix
+    that grows by doubling and are scored by cosine similarity through `index`; the default
+    FlatIndex makes a query a single matrix-vector product.
+    """
+
+    def __init__(self, embedder: EmbeddingModel, initial_capacity: int = 1024, concurrency: int = 4,
+                 index: VectorIndex = None):
         self.embedder = embedder
+        self.concurrency = concurrency
+        self.index = index if index is not None else FlatIndex()
         self.data = []
-        self.embeddings = []
+        self._capacity = initial_capacity
+        self._matrix = None
+        self._size = 0
+        self._lock = threading.Lock()
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        if self._matrix is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._matrix[:self._size]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _snapshot(self) -> np.ndarray:
+        # Rows below _size are never rewritten, so the view stays valid after the lock is released
+        with self._lock:
+            return self.embeddings
+
+    def _append(self, vectors: np.ndarray, items: List[tuple]):
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32))
+
+        with self._lock:
+            needed = self._size + len(vectors)
+
+            if self._matrix is None:
+                capacity = max(self._capacity, needed)
+                self._matrix = np.empty((capacity, vectors.shape[1]), dtype=np.float32)
+            elif needed > len(self._matrix):
+                capacity = max(2 * len(self._matrix), needed)
+                grown = np.empty((capacity, self._matrix.shape[1]), dtype=np.float32)
+                grown[:self._size] = self._matrix[:self._size]
+                self._matrix = grown
+
+            self._matrix[self._size:needed] = vectors
+            self.index.add(self._matrix, self._size, needed)
+            self.data.extend(items)
+            self._size = needed
 
     def add(self, text: str, metadata: dict = None):
         if metadata is None:
             metadata = {}
 
         embedding = self.embedder.embed(text)
-        self.data.append((text, metadata))
-        self.embeddings.append(np.array(embedding))
+        self._append(np.asarray([embedding]), [(text, metadata)])
+
+    def add_stream(self, items: Iterable[Union[str, tuple[str, dict]]]) -> int:
+        """
+        Embed documents in provider-sized batches, keeping at most `concurrency` batches in flight,
+        and append each batch to the matrix in one copy. Batches are appended in input order.
+        """
+        items = ((item, {}) if isinstance(item, str) else (item[0], item[1] or {}) for item in items)
+        count = 0
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            pending = deque()
+
+            def flush_one():
+                batch, future = pending.popleft()
+                self._append(np.asarray(future.result()), batch)
+                return len(batch)
+
+            for batch in self.embedder.iter_batches(items):
+                pending.append((batch, pool.submit(self.embedder.embed_batch, [text for text, _ in batch])))
+
+                if len(pending) >= self.concurrency:
+                    count += flush_one()
+
+            while pending:
+                count += flush_one()
+
+        return count
 
     def query(self, text: str, k: int = 5) -> List[Any]:
-        if not self.embeddings:
+        with start_span("memory.query", **{"memory.k": k, "memory.size": self._size}) as span, \
+                MEMORY_QUERY_DURATION.time():
+            if not self._size:
+                return []
+
+            query_vecs = normalize_rows(np.asarray([self.embedder.embed(text)], dtype=np.float32))
+            ids = self.index.search(self._snapshot(), query_vecs, k)[0]
+            span.set_attribute("memory.results", len(ids))
+            return [self.data[i] for i in ids]
+
+    def search(self, text: str, k: int = 5, min_score: Optional[float] = None,
+               filters: Optional[dict] = None) -> List[dict]:
+        with start_span("memory.search", **{"memory.k": k, "memory.size": self._size}) as span, \
+                MEMORY_QUERY_DURATION.time():
+            if not self._size:
+                return []
+
+            query_vecs = normalize_rows(np.asarray([self.embedder.embed(text)], dtype=np.float32))
+
+            # Filtered searches overfetch, widening until k results match or the store is exhausted
+            fetch = min(self._size, k * 4) if filters else k
+            while True:
+                matrix = self._snapshot()
+                ids = self.index.search(matrix, query_vecs, fetch)[0]
+                scores = matrix[ids] @ query_vecs[0]
+
+                results, below_threshold = [], False
+                for i, score in zip(ids, scores):
+                    if min_score is not None and score < min_score:
+                        below_threshold = True
+                        break
+
+                    item_text, metadata = self.data[i]
+                    if filters and not _matches(metadata, filters):
+                        continue
+
+                    results.append({"text": item_text, "metadata": metadata, "score": float(score)})
+                    if len(results) == k:
+                        break
+
+                if len(results) == k or below_threshold or not filters or fetch >= len(matrix):
+                    span.set_attribute("memory.results", len(results))
+                    return results
+                fetch = min(len(matrix), fetch * 4)
+
+    def query_batch(self, texts: List[str], k: int = 5) -> List[List[Any]]:
+        if not texts:
             return []
+        if not self._size:
+            return [[] for _ in texts]
 
-        query_vec = np.array(self.embedder.embed(text))
-        scores = [np.dot(query_vec, emb) for emb in self.embeddings]
-        top_indices = np.argsort(scores)[::-1][:k]
-        return [self.data[i] for i in top_indices]
+        attributes = {"memory.k": k, "memory.size": self._size, "memory.queries": len(texts)}
+        with start_span("memory.query_batch", **attributes), MEMORY_QUERY_DURATION.time():
+            query_vecs = normalize_rows(np.asarray(self.embedder.embed_batch(texts), dtype=np.float32))
+            return [[self.data[i] for i in ids] for ids in self.index.search(self._snapshot(), query_vecs, k)]
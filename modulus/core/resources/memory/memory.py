@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List, Any
+from typing import Iterable, List, Any, Optional, Union
 
 
 class Memory(ABC):
@@ -10,3 +10,32 @@ class Memory(ABC):
     @abstractmethod
     def query(self, text: str, k: int = 5) -> List[Any]:
         pass
+
+    def add_many(self, texts: List[str], metadatas: List[dict] = None) -> None:
+        if metadatas is None:
+            metadatas = [{} for _ in texts]
+
+        self.add_stream(zip(texts, metadatas))
+
+    def add_stream(self, items: Iterable[Union[str, tuple[str, dict]]]) -> int:
+        """
+        Add documents from an iterable of texts or (text, metadata) pairs, returning how many were added.
+        """
+        count = 0
+        for item in items:
+            text, metadata = (item, {}) if isinstance(item, str) else item
+            self.add(text, metadata)
+            count += 1
+        return count
+
+    def query_batch(self, texts: List[str], k: int = 5) -> List[List[Any]]:
+        return [self.query(text, k) for text in texts]
+
+    def search(self, text: str, k: int = 5, min_score: Optional[float] = None,
+               filters: Optional[dict] = None) -> List[dict]:
+        """
+        Like `query`, with similarity scores: {"text", "metadata", "score"} dicts, best first.
+        Results scoring below `min_score`, or whose metadata doesn't match every key of `filters`
+        (a value or a list of accepted values), are left out.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not support scored search")
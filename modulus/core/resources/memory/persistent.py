@@ -0,0 +1,166 @@
+import json
+import os
+
+import numpy as np
+
+from contextlib import contextmanager
+from typing import Iterable, List, Any, Optional, Union
+
+from modulus.core.resources.embedding import EmbeddingModel
+from modulus.core.resources.memory.index import VectorIndex, normalize_rows
+from modulus.core.resources.memory.local import LocalMemory
+
+try:
+    import fcntl
+except ImportError:  # Windows, fall back to in-process locking only
+    fcntl = None
+
+
+@contextmanager
+def _file_lock(path: str):
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _write_durable(path: str, offset: int, payload: bytes):
+    """
+    Drop anything past `offset` (left over from an interrupted append), then append and fsync.
+    """
+    with open(path, "ab") as f:
+        f.truncate(offset)
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class PersistentMemory(LocalMemory):
+    """
+    LocalMemory stored on disk under `path`:
+
+    - vectors.f32: normalized float32 rows, opened read-only with np.memmap so worker
+      processes share the OS page cache instead of each holding a copy
+    - metadata.jsonl: one [text, metadata] line per row
+    - header.json: dimension, committed row count and metadata size
+    - index.npz: the search index state, saved after bulk ingestion; rows committed after
+      the last save are indexed incrementally on load
+
+    Appends write data first and then atomically replace the header, so a crash mid-append
+    leaves the previous committed state intact and the partial tail is discarded on the next append.
+    """
+
+    def __init__(self, embedder: EmbeddingModel, path: str, concurrency: int = 4, index: VectorIndex = None):
+        super().__init__(embedder, concurrency=concurrency, index=index)
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._metadata_path = os.path.join(path, "metadata.jsonl")
+        self._header_path = os.path.join(path, "header.json")
+        self._lock_path = os.path.join(path, ".lock")
+        self._index_path = os.path.join(path, "index.npz")
+
+        self._dim = None
+        self._metadata_bytes = 0
+
+        self.index.load(self._index_path)
+        self.refresh()
+
+    def _read_header(self) -> dict:
+        try:
+            with open(self._header_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"dim": None, "count": 0, "metadata_bytes": 0}
+
+    def _sync(self, header: dict):
+        """
+        Bring the in-process view up to the committed state described by `header`.
+        """
+        if header["metadata_bytes"] > self._metadata_bytes:
+            with open(self._metadata_path, "rb") as f:
+                f.seek(self._metadata_bytes)
+                lines = f.read(header["metadata_bytes"] - self._metadata_bytes).splitlines()
+            self.data.extend(tuple(json.loads(line)) for line in lines)
+
+        self._dim = header["dim"]
+        self._metadata_bytes = header["metadata_bytes"]
+        self._size = header["count"]
+
+        if self._size:
+            self._matrix = np.memmap(self._vectors_path, dtype=np.float32, mode="r",
+                                     shape=(self._size, self._dim))
+
+            if self.index.count < self._size:
+                self.index.add(self._matrix, self.index.count, self._size)
+
+    def refresh(self):
+        """
+        Pick up rows committed by this or other processes since the last load.
+        """
+        # The committed count only grows, unlike the header's mtime, which two quick commits can share
+        header = self._read_header()
+        if header["count"] <= self._size:
+            return
+
+        with self._lock:
+            # An append may have synced past this header while it was read
+            if header["count"] > self._size:
+                self._sync(header)
+
+    def _append(self, vectors: np.ndarray, items: List[tuple]):
+        vectors = normalize_rows(np.asarray(vectors, dtype=np.float32))
+        metadata = "".join(json.dumps([text, meta]) + "\n" for text, meta in items).encode("utf-8")
+
+        with self._lock, _file_lock(self._lock_path):
+            header = self._read_header()
+            self._sync(header)
+
+            dim = header["dim"] if header["dim"] is not None else vectors.shape[1]
+            if vectors.shape[1] != dim:
+                raise ValueError(f"Memory at {self.path} stores {dim}-dimensional vectors, got {vectors.shape[1]}")
+
+            _write_durable(self._vectors_path, header["count"] * dim * 4, vectors.tobytes())
+            _write_durable(self._metadata_path, header["metadata_bytes"], metadata)
+
+            header = {
+                "dim": dim,
+                "count": header["count"] + len(vectors),
+                "metadata_bytes": header["metadata_bytes"] + len(metadata),
+            }
+
+            tmp_path = self._header_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(header, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._header_path)
+
+            self._sync(header)
+
+    def save_index(self):
+        with self._lock, _file_lock(self._lock_path):
+            self.index.save(self._index_path)
+
+    def add_stream(self, items: Iterable[Union[str, tuple[str, dict]]]) -> int:
+        count = super().add_stream(items)
+        self.save_index()
+        return count
+
+    def query(self, text: str, k: int = 5) -> List[Any]:
+        self.refresh()
+        return super().query(text, k)
+
+    def query_batch(self, texts: List[str], k: int = 5) -> List[List[Any]]:
+        self.refresh()
+        return super().query_batch(texts, k)
+
+    def search(self, text: str, k: int = 5, min_score: Optional[float] = None,
+               filters: Optional[dict] = None) -> List[dict]:
+        self.refresh()
+        return super().search(text, k, min_score, filters)
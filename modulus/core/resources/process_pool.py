@@ -0,0 +1,308 @@
+import asyncio
+import itertools
+import os
+import signal
+import threading
+import time
+import traceback
+
+from concurrent.futures import (FIRST_COMPLETED, Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError,
+                                wait)
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from multiprocessing import get_context
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: no address space limits
+    resource = None
+
+from modulus.core.util import load_function
+
+# str and bytes arguments at least this large go through shared memory instead of the worker's pipe
+SHARED_MEMORY_THRESHOLD = 1 << 20
+# How long past its timeout a call may run before its worker is killed (stuck in C code, ignoring SIGALRM)
+KILL_GRACE = 1.0
+
+
+class ToolExecutionError(RuntimeError):
+    """A tool raised in a worker process. `traceback` is the worker's formatted traceback."""
+
+    def __init__(self, message: str, traceback: str = None):
+        super().__init__(message, traceback)
+        self.traceback = traceback
+
+    def __str__(self):
+        return self.args[0]
+
+
+class _SharedArg:
+    """Placeholder for an argument passed through a shared memory block."""
+
+    def __init__(self, name: str, size: int, text: bool):
+        self.name = name
+        self.size = size
+        self.text = text
+
+
+# Worker process state: functions loaded by the initializer, by function path,
+# and the queue that tells the server when a worker picks a call up
+_functions = {}
+_started = None
+
+
+def _init_worker(function_paths: tuple, started):
+    global _started
+    # Ctrl-C goes to the whole process group; the server shuts the pool down itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _started = started
+    for function_path in function_paths:
+        _functions[function_path] = load_function(function_path)
+
+
+def _ready():
+    return os.getpid()
+
+
+@contextmanager
+def _deadline(seconds: Optional[float]):
+    if not seconds or not hasattr(signal, "setitimer"):
+        yield
+        return
+
+    def expire(signum, frame):
+        raise TimeoutError(f"Tool call exceeded {seconds}s")
+
+    previous = signal.signal(signal.SIGALRM, expire)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+@contextmanager
+def _memory_limit(megabytes: Optional[int]):
+    if not megabytes or resource is None:
+        yield
+        return
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    limit = megabytes * 1024 * 1024
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+    try:
+        yield
+    finally:
+        resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+def _call(call_id: int, function_path: str, kwargs: dict, timeout: Optional[float],
+          memory_limit_mb: Optional[int]) -> Any:
+    _started.put(call_id)
+
+    fn = _functions.get(function_path)
+    if fn is None:
+        fn = _functions[function_path] = load_function(function_path)
+
+    blocks, views, arguments = [], [], {}
+    try:
+        for key, value in kwargs.items():
+            if not isinstance(value, _SharedArg):
+                arguments[key] = value
+                continue
+
+            # Workers share the server's resource tracker, so attaching doesn't register the block twice
+            block = SharedMemory(name=value.name)
+            blocks.append(block)
+            view = block.buf[:value.size]
+            views.append(view)
+            if value.text:
+                # Text has to be decoded once; bytes are handed over as a read-only view without copying
+                arguments[key] = str(view, "utf-8")
+            else:
+                arguments[key] = view.toreadonly()
+                views.append(arguments[key])
+
+        with _deadline(timeout), _memory_limit(memory_limit_mb):
+            return fn(**arguments)
+    except Exception as e:
+        # User exception classes may not unpickle in the server, so only their text crosses over
+        raise ToolExecutionError(f"{type(e).__name__}: {e}", traceback.format_exc()) from None
+    finally:
+        arguments.clear()
+        for view in reversed(views):
+            view.release()
+        for block in blocks:
+            try:
+                block.close()
+            except BufferError:
+                # The tool kept a view of the argument; the mapping goes away with the process
+                pass
+
+
+def _share(kwargs: dict) -> tuple[dict, list[SharedMemory]]:
+    shared, blocks = {}, []
+    for key, value in kwargs.items():
+        if isinstance(value, str) and len(value) >= SHARED_MEMORY_THRESHOLD:
+            data, text = value.encode("utf-8"), True
+        elif isinstance(value, (bytes, bytearray, memoryview)) and len(value) >= SHARED_MEMORY_THRESHOLD:
+            data, text = value, False
+        else:
+            shared[key] = value
+            continue
+
+        block = SharedMemory(create=True, size=len(data))
+        block.buf[:len(data)] = data
+        blocks.append(block)
+        shared[key] = _SharedArg(block.name, len(data), text)
+    return shared, blocks
+
+
+def _release(blocks: list[SharedMemory]):
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+class ToolProcessPool:
+    """
+    Worker processes for CPU-heavy function tools, so they run outside the server's GIL.
+
+    All workers are spawned on first use and import every function in `function_paths` before
+    taking calls. Each call runs with an optional `timeout`, enforced in the worker with SIGALRM
+    (and by killing the pool's workers if the call still hasn't returned `KILL_GRACE` seconds later),
+    and an optional address space limit `memory_limit_mb` for the worker while the call runs.
+    Timeouts count from when a worker picks the call up, not the time spent queued behind busy workers.
+
+    Large str/bytes arguments are written once to shared memory rather than pickled through the
+    worker's pipe; bytes arrive in the function as a read-only memoryview.
+    """
+
+    def __init__(self, function_paths: list[str], workers: int = None):
+        self.function_paths = tuple(function_paths)
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+        self._lock = threading.Lock()
+        # Start queue of each live pool, and the start time future of each call not yet picked up
+        self._started_queues = {}
+        self._starts = {}
+        self._call_ids = itertools.count()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Spawned, not forked: the server process runs threads
+                context = get_context("spawn")
+                started = context.SimpleQueue()
+                pool = ProcessPoolExecutor(self.workers, mp_context=context,
+                                           initializer=_init_worker, initargs=(self.function_paths, started))
+                threading.Thread(target=self._watch, args=(started,), daemon=True,
+                                 name="modulus-tool-pool-starts").start()
+                # Each submit to an idle pool starts a worker, so this brings up all of them now
+                for future in [pool.submit(_ready) for _ in range(self.workers)]:
+                    future.result()
+                self._started_queues[pool] = started
+                self._pool = pool
+            return self._pool
+
+    def _watch(self, started):
+        while True:
+            call_id = started.get()
+            if call_id is None:
+                return
+
+            # Calls given up before a worker reached them have cancelled their start future
+            start = self._starts.pop(call_id, None)
+            if start is not None and start.set_running_or_notify_cancel():
+                start.set_result(time.monotonic())
+
+    def _submit(self, pool: ProcessPoolExecutor, function_path: str, kwargs: dict, timeout: Optional[float],
+                memory_limit_mb: Optional[int]) -> tuple[int, Future, Future]:
+        call_id = next(self._call_ids)
+        start = self._starts[call_id] = Future()
+        try:
+            return call_id, start, pool.submit(_call, call_id, function_path, kwargs, timeout, memory_limit_mb)
+        except BaseException:
+            self._starts.pop(call_id, None)
+            raise
+
+    def _discard(self, pool: ProcessPoolExecutor):
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+            started = self._started_queues.pop(pool, None)
+        if started is not None:
+            started.put(None)
+
+        # Other calls running on these workers fail with BrokenProcessPool
+        for process in list(getattr(pool, "_processes", {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, function_path: str, kwargs: dict, timeout: float = None, memory_limit_mb: int = None) -> Any:
+        shared, blocks = _share(kwargs)
+        pool = self._executor()
+        call_id = None
+        try:
+            call_id, start, future = self._submit(pool, function_path, shared, timeout, memory_limit_mb)
+            if timeout is None:
+                return future.result()
+
+            # The deadline starts once a worker picks the call up
+            wait([start, future], return_when=FIRST_COMPLETED)
+            if future.done():
+                return future.result()
+            return future.result(max(0.0, start.result() + timeout + KILL_GRACE - time.monotonic()))
+        except FutureTimeoutError:
+            self._discard(pool)
+            raise TimeoutError(f"Tool call exceeded {timeout}s") from None
+        except BrokenProcessPool as e:
+            self._discard(pool)
+            raise ToolExecutionError(f"Tool worker process died: {e}") from None
+        finally:
+            self._starts.pop(call_id, None)
+            _release(blocks)
+
+    async def arun(self, function_path: str, kwargs: dict, timeout: float = None,
+                   memory_limit_mb: int = None) -> Any:
+        shared, blocks = _share(kwargs)
+        pool = await asyncio.to_thread(self._executor)
+        call_id, started = None, None
+        try:
+            call_id, start, future = self._submit(pool, function_path, shared, timeout, memory_limit_mb)
+            result = asyncio.wrap_future(future)
+            if timeout is None:
+                return await result
+
+            # The deadline starts once a worker picks the call up
+            started = asyncio.wrap_future(start)
+            await asyncio.wait([started, result], return_when=asyncio.FIRST_COMPLETED)
+            if result.done():
+                return result.result()
+            return await asyncio.wait_for(result, max(0.0, started.result() + timeout + KILL_GRACE - time.monotonic()))
+        except asyncio.TimeoutError:
+            self._discard(pool)
+            raise TimeoutError(f"Tool call exceeded {timeout}s") from None
+        except BrokenProcessPool as e:
+            self._discard(pool)
+            raise ToolExecutionError(f"Tool worker process died: {e}") from None
+        finally:
+            if started is not None:
+                started.cancel()
+            self._starts.pop(call_id, None)
+            _release(blocks)
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+            started = self._started_queues.pop(pool, None)
+        if pool is not None:
+            pool.shutdown()
+        if started is not None:
+            started.put(None)
@@ -1,3 +1,5 @@
+from .rate_limiter import RateLimiter
 from .provider import Provider
 from .openai_provider import OpenAIProvider
 from .anthropic_provider import AnthropicProvider
+from .mock_provider import MockProvider, MockProviderError
@@ -4,19 +4,28 @@ from modulus.core.resources.provider import Provider
 
 
 class AnthropicProvider(Provider):
+    http_client_class = anthropic.DefaultHttpxClient
+    async_http_client_class = anthropic.DefaultAsyncHttpxClient
+
     def __init__(self, api_key: str, params: dict = {}):
-        super().__init__()
+        super().__init__(params)
 
         self.api_key = api_key
         self._client = None
-        self.params = params
+        self._async_client = None
 
     def connect(self):
         super().connect()
-        self._client = anthropic.Anthropic(api_key=self.api_key)
+        self._client = anthropic.Anthropic(api_key=self.api_key, http_client=self.get_http_client())
 
     def get_client(self):
         if self._client is None:
             self.connect()
 
         return self._client
+
+    def get_async_client(self):
+        if self._async_client is None:
+            self._async_client = anthropic.AsyncAnthropic(api_key=self.api_key, http_client=self.get_async_http_client())
+
+        return self._async_client
@@ -0,0 +1,68 @@
+import math
+import random
+import threading
+
+from modulus.core.resources.provider import Provider
+
+
+class MockProviderError(Exception):
+    """Injected failure, raised at the configured `error_rate`."""
+    pass
+
+
+class MockProvider(Provider):
+    """
+    Local stand-in for a model API, for benchmarks and tests that shouldn't cost anything.
+
+    Params (all optional):
+    - latency_ms: mean time to first token (default 200)
+    - latency_stddev_ms: spread of the time to first token (default latency_ms / 4)
+    - latency_distribution: "fixed", "normal" or "lognormal" (default)
+    - tokens_per_second: output generation rate, 0 for instant (default 50)
+    - output_tokens: response length when the LLM sets no max_tokens (default 64)
+    - error_rate: fraction of calls failing with MockProviderError (default 0)
+    - tool_calls: tool calls requested in the first turn of a conversation with tools
+      (default one per tool; 0 never calls tools)
+    - seed: makes latencies and failures reproducible
+    """
+
+    DISTRIBUTIONS = ("fixed", "normal", "lognormal")
+
+    def __init__(self, params: dict = {}):
+        super().__init__(params)
+
+        self.latency = self.params.get("latency_ms", 200) / 1000
+        self.latency_stddev = self.params.get("latency_stddev_ms", self.latency * 1000 / 4) / 1000
+        self.distribution = self.params.get("latency_distribution", "lognormal")
+        self.tokens_per_second = self.params.get("tokens_per_second", 50)
+        self.output_tokens = self.params.get("output_tokens", 64)
+        self.error_rate = self.params.get("error_rate", 0.0)
+        self.tool_calls = self.params.get("tool_calls")
+
+        if self.distribution not in self.DISTRIBUTIONS:
+            raise ValueError(f"Mock provider latency distribution `{self.distribution}` is not supported")
+
+        self._random = random.Random(self.params.get("seed"))
+        self._random_lock = threading.Lock()
+
+    def connect(self):
+        super().connect()
+
+    def sample_latency(self) -> float:
+        """Seconds until the first token of a response."""
+        with self._random_lock:
+            if self.distribution == "fixed" or self.latency_stddev == 0 or self.latency == 0:
+                return self.latency
+            if self.distribution == "normal":
+                return max(0.0, self._random.gauss(self.latency, self.latency_stddev))
+
+            # Lognormal with the configured mean and standard deviation: a long tail like real APIs
+            sigma2 = math.log(1 + (self.latency_stddev / self.latency) ** 2)
+            return self._random.lognormvariate(math.log(self.latency) - sigma2 / 2, math.sqrt(sigma2))
+
+    def sample_failure(self) -> bool:
+        with self._random_lock:
+            return self._random.random() < self.error_rate
+
+    def token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
@@ -1,9 +1,31 @@
+import importlib
+import threading
+
 from abc import ABC, abstractmethod
 
+from modulus.core.resources.provider.rate_limiter import RateLimiter
+
+
+def _http_package(client_class: type):
+    """
+    The httpx-compatible package an SDK's HTTP client class is built on
+    (newer SDK releases moved from httpx to httpx2, which reject each other's objects).
+    """
+    return importlib.import_module(client_class.__mro__[1].__module__.partition(".")[0])
+
 
 class Provider(ABC):
-    def __init__(self):
+    # The SDK's default sync/async HTTP client classes, set by subclasses
+    http_client_class = None
+    async_http_client_class = None
+
+    def __init__(self, params: dict = None):
         self.connected = False
+        self.params = params or {}
+        self.limiter = RateLimiter.from_params(self.params)
+        self._http_client = None
+        self._async_http_client = None
+        self._http_lock = threading.Lock()
 
     @abstractmethod
     def connect(self):
@@ -11,3 +33,64 @@ class Provider(ABC):
 
     def is_connected(self):
         return self.connected
+
+    def _http_options(self, client_class: type) -> dict:
+        """
+        httpx settings from the [provider.<name>] block:
+        max_connections, max_keepalive_connections, keepalive_expiry, http2,
+        timeout, connect_timeout, read_timeout.
+        """
+        httpx = _http_package(client_class)
+        timeout = self.params.get("timeout", 600.0)
+        return dict(
+            limits=httpx.Limits(
+                max_connections=self.params.get("max_connections", 100),
+                max_keepalive_connections=self.params.get("max_keepalive_connections", 20),
+                keepalive_expiry=self.params.get("keepalive_expiry", 5.0),
+            ),
+            timeout=httpx.Timeout(
+                timeout,
+                connect=self.params.get("connect_timeout", 5.0),
+                read=self.params.get("read_timeout", timeout),
+            ),
+            http2=self.params.get("http2", False),
+        )
+
+    def get_http_client(self):
+        """
+        Connection pool shared by every synchronous SDK client created from this provider.
+        """
+        with self._http_lock:
+            if self._http_client is None:
+                self._http_client = self.http_client_class(**self._http_options(self.http_client_class))
+        return self._http_client
+
+    def get_async_http_client(self):
+        """
+        Connection pool shared by every asynchronous SDK client created from this provider.
+        """
+        with self._http_lock:
+            if self._async_http_client is None:
+                self._async_http_client = self.async_http_client_class(
+                    **self._http_options(self.async_http_client_class)
+                )
+        return self._async_http_client
+
+    def pool_stats(self) -> dict:
+        """
+        Current connection counts of the sync and async pools, for monitoring.
+        """
+        stats = {}
+        for kind, client in (("sync", self._http_client), ("async", self._async_http_client)):
+            if client is None:
+                continue
+
+            # httpx does not expose its pool publicly; read the underlying connection pool
+            pool = getattr(getattr(client, "_transport", None), "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+            stats[kind] = {
+                "connections": len(connections),
+                "idle": sum(1 for connection in connections if connection.is_idle()),
+                "max_connections": getattr(pool, "_max_connections", None),
+            }
+        return stats
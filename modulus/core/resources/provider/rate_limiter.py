@@ -0,0 +1,153 @@
+import asyncio
+import threading
+import time
+
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional
+
+
+class Slot:
+    """
+    An admitted call. Set `actual_tokens` from the response usage before the slot is released
+    so the limiter can correct its estimate.
+    """
+
+    def __init__(self, estimated_tokens: int):
+        self.estimated_tokens = estimated_tokens
+        self.actual_tokens: Optional[int] = None
+        # What the limiter took from its token bucket on admission (the estimate, capped at tpm)
+        self.charged_tokens = 0
+
+
+class RateLimiter:
+    """
+    Client-side admission control shared by every LLM and embedding model of a provider.
+
+    Requests-per-minute and tokens-per-minute are token buckets refilled continuously, so bursts
+    up to a minute's budget are admitted immediately and sustained load is smoothed to the ceiling.
+    `max_concurrency` caps in-flight calls. Callers that can't be admitted wait (sleeping threads
+    or awaiting coroutines) instead of being sent and rejected with a 429.
+    """
+
+    def __init__(self, rpm: Optional[float] = None, tpm: Optional[float] = None,
+                 max_concurrency: Optional[int] = None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+
+        self._requests = float(rpm) if rpm else 0.0
+        self._tokens = float(tpm) if tpm else 0.0
+        self._in_flight = 0
+        self._updated = time.monotonic()
+        self._condition = threading.Condition()
+
+        self.admitted = 0
+        self.delayed = 0
+
+    @classmethod
+    def from_params(cls, params: dict) -> "RateLimiter":
+        return cls(params.get("rpm"), params.get("tpm"), params.get("max_concurrency"))
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.rpm or self.tpm or self.max_concurrency)
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(float(self.rpm), self._requests + elapsed * self.rpm / 60.0)
+        if self.tpm:
+            self._tokens = min(float(self.tpm), self._tokens + elapsed * self.tpm / 60.0)
+
+    def _try_admit(self, slot: Slot) -> float:
+        """
+        Admit the call and return 0, or return how long to wait before trying again.
+        Must be called with the condition held.
+        """
+        self._refill(time.monotonic())
+
+        # A single call larger than the whole bucket is admitted once the bucket is full
+        tokens = min(slot.estimated_tokens, self.tpm) if self.tpm else slot.estimated_tokens
+
+        wait = 0.0
+        if self.rpm and self._requests < 1:
+            wait = max(wait, (1 - self._requests) * 60.0 / self.rpm)
+        if self.tpm and self._tokens < tokens:
+            wait = max(wait, (tokens - self._tokens) * 60.0 / self.tpm)
+        if self.max_concurrency and self._in_flight >= self.max_concurrency:
+            wait = max(wait, 0.05)
+
+        if wait > 0:
+            return wait
+
+        if self.rpm:
+            self._requests -= 1
+        if self.tpm:
+            self._tokens -= tokens
+            slot.charged_tokens = tokens
+        self._in_flight += 1
+        self.admitted += 1
+        return 0.0
+
+    def _release(self, slot: Slot):
+        with self._condition:
+            self._in_flight -= 1
+            if self.tpm and slot.actual_tokens is not None:
+                # Refund an overestimate, or charge the extra usage (the bucket may go negative)
+                self._tokens += slot.charged_tokens - slot.actual_tokens
+            self._condition.notify_all()
+
+    @contextmanager
+    def limit(self, estimated_tokens: int = 0):
+        slot = Slot(estimated_tokens)
+        if not self.enabled:
+            yield slot
+            return
+
+        with self._condition:
+            wait = self._try_admit(slot)
+            if wait:
+                self.delayed += 1
+            while wait:
+                self._condition.wait(wait)
+                wait = self._try_admit(slot)
+
+        try:
+            yield slot
+        finally:
+            self._release(slot)
+
+    @asynccontextmanager
+    async def alimit(self, estimated_tokens: int = 0):
+        slot = Slot(estimated_tokens)
+        if not self.enabled:
+            yield slot
+            return
+
+        delayed = False
+        while True:
+            with self._condition:
+                wait = self._try_admit(slot)
+                if wait and not delayed:
+                    self.delayed += 1
+                    delayed = True
+            if not wait:
+                break
+            await asyncio.sleep(wait)
+
+        try:
+            yield slot
+        finally:
+            self._release(slot)
+
+    def stats(self) -> dict:
+        with self._condition:
+            self._refill(time.monotonic())
+            return {
+                "in_flight": self._in_flight,
+                "admitted": self.admitted,
+                "delayed": self.delayed,
+                "requests_available": self._requests if self.rpm else None,
+                "tokens_available": self._tokens if self.tpm else None,
+            }
@@ -1,35 +1,128 @@
-from fastapi import FastAPI, Request
+import json
+
+from contextlib import contextmanager
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 import uvicorn
-from threading import Thread
 
 from modulus.core.resources.task import Task
+from modulus.core.resources.batch import BatchRunner, parse_batch_line
+from modulus.core.metrics import scrape, track_request
+from modulus.core.stages import collect_stages, server_timing, stage
+from modulus.core.tracing import start_span
 from modulus.core.resources.deployment import DeploymentRuntime
 
+# [deployment.<name>] option -> uvicorn setting
+SERVER_OPTIONS = {
+    "backlog": "backlog",
+    "keepalive": "timeout_keep_alive",
+    "limit_concurrency": "limit_concurrency",
+    "graceful_timeout": "timeout_graceful_shutdown",
+}
+
+
+def _sse(event: dict) -> str:
+    payload = {k: v for k, v in event.items() if k != "event"}
+    return f"event: {event['event']}\ndata: {json.dumps(payload)}\n\n"
+
 
 class FastAPIRuntime(DeploymentRuntime):
-    def start(self, tasks: list[Task], port: int):
+    def __init__(self, app_factory: str = None, batch_concurrency: int = 8, metrics: bool = True):
+        # Import string ("module:function") of a zero-argument factory returning the app.
+        # Required for multiple workers, since each worker process must build its own app.
+        self.app_factory = app_factory
+        # Flows each /{task}/batch request keeps in flight
+        self.batch_concurrency = batch_concurrency
+        # Serve Prometheus metrics at /metrics
+        self.metrics = metrics
+
+    def _add_routes(self, app: FastAPI, task: Task):
+        route_path = f"/{task.name}"
+
+        # Handlers capture `task` from this scope; a default argument would make FastAPI treat it as a parameter
+        @contextmanager
+        def observe(route: str):
+            with track_request(route), \
+                    start_span(f"POST {route}", kind="server", **{"http.route": route, "task.name": task.name}):
+                yield
+
+        async def handler(request: Request):
+            stages = collect_stages()
+
+            with observe(route_path):
+                with stage("parse"):
+                    input_data = await request.json()
+
+                result = await task.astart(input_data)
+
+                with stage("serialize"):
+                    response = JSONResponse(result)
+
+            # Per-stage durations for clients like `modulus bench`
+            response.headers["Server-Timing"] = server_timing(stages)
+            return response
+
+        async def stream_handler(request: Request):
+            input_data = await request.json()
+
+            async def events():
+                with observe(f"{route_path}/stream"):
+                    async for event in task.astream(input_data):
+                        yield _sse(event)
+
+            return StreamingResponse(events(), media_type="text/event-stream",
+                                     headers={"Cache-Control": "no-cache"})
+
+        async def batch_handler(request: Request):
+            # The body is read up front: StreamingResponse consumes `receive` to watch for disconnects
+            lines = (await request.body()).decode("utf-8").splitlines()
+            try:
+                items = [parse_batch_line(line, n) for n, line in enumerate(lines, start=1)]
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=f"Invalid JSONL input: {e}")
+
+            async def results():
+                with observe(f"{route_path}/batch"):
+                    runner = BatchRunner(task, self.batch_concurrency)
+                    async for result in runner.arun(item for item in items if item is not None):
+                        yield json.dumps(result) + "\n"
+
+            return StreamingResponse(results(), media_type="application/x-ndjson")
+
+        # Register the routes with FastAPI
+        app.post(route_path)(handler)
+        app.post(f"{route_path}/stream")(stream_handler)
+        app.post(f"{route_path}/batch")(batch_handler)
+
+    def build_app(self, tasks: list[Task]) -> FastAPI:
         app = FastAPI()
 
         if not tasks:
             raise ValueError("FastAPI runtime requires at least one task to expose.")
 
         for task in tasks:
-            route_path = f"/{task.name}"
-
-            # Define a handler for each route (closure to capture task)
-            async def handler(request: Request, task=task):
-                input_data = await request.json()
-                result = task.start(input_data)
-                return result
-
-            # Register the route with FastAPI
-            app.post(route_path)(handler)
-
-        # Run in a separate thread to avoid blocking
-        thread = Thread(
-            target=uvicorn.run,
-            args=(app,),
-            kwargs={"host": "0.0.0.0", "port": port},
-            daemon=True
-        )
-        thread.start()
+            self._add_routes(app, task)
+
+        if self.metrics:
+            async def metrics_handler():
+                return PlainTextResponse(scrape(), media_type="text/plain; version=0.0.4")
+
+            app.get("/metrics")(metrics_handler)
+
+        return app
+
+    def start(self, tasks: list[Task], port: int, host: str = "0.0.0.0", workers: int = 1, options: dict = None):
+        options = options or {}
+        server_kwargs = {
+            setting: options[option] for option, setting in SERVER_OPTIONS.items() if option in options
+        }
+
+        if workers > 1:
+            if self.app_factory is None:
+                raise ValueError("FastAPI runtime requires an app factory to run multiple workers.")
+
+            # uvicorn supervises the worker processes and forwards SIGINT/SIGTERM for graceful shutdown
+            uvicorn.run(self.app_factory, factory=True, host=host, port=port, workers=workers, **server_kwargs)
+        else:
+            uvicorn.run(self.build_app(tasks), host=host, port=port, **server_kwargs)
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Optional
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls that share a key: the first caller (the leader) runs the call
+    and every caller that arrives while it is in flight waits for and receives the same result,
+    or the same exception. Nothing is remembered once the call finishes.
+
+    `max_waiters` caps how many callers may share one in-flight call; callers past the cap run
+    their own call instead of piling onto a slow one.
+    """
+
+    def __init__(self, max_waiters: Optional[int] = None):
+        self.max_waiters = max_waiters
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future] = {}
+        self._acalls: dict[str, asyncio.Task] = {}
+        self._waiters: dict[str, int] = {}
+
+        self.leaders = 0
+        self.coalesced = 0
+        self.overflow = 0
+
+    def _join(self, key: str, calls: dict) -> Any:
+        """
+        Return the in-flight call to wait on, or None if the caller must run its own.
+        Must be called with the lock held.
+        """
+        call = calls.get(key)
+        if call is None:
+            return None
+
+        if self.max_waiters is not None and self._waiters.get(key, 0) >= self.max_waiters:
+            self.overflow += 1
+            return None
+
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        self.coalesced += 1
+        return call
+
+    def _forget(self, key: str, calls: dict, call: Any):
+        with self._lock:
+            if calls.get(key) is call:
+                del calls[key]
+                self._waiters.pop(key, None)
+
+    def run(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._join(key, self._calls)
+            leader = call is None
+            if leader:
+                call = Future()
+                self.leaders += 1
+                # Overflow callers run on their own without replacing the shared call
+                if key not in self._calls:
+                    self._calls[key] = call
+
+        if not leader:
+            return call.result()
+
+        try:
+            call.set_result(fn())
+        except BaseException as e:
+            call.set_exception(e)
+        finally:
+            self._forget(key, self._calls, call)
+
+        return call.result()
+
+    async def arun(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        with self._lock:
+            call = self._join(key, self._acalls)
+            if call is None:
+                # The call runs in its own task so a disconnecting leader doesn't cancel it for the waiters
+                call = asyncio.ensure_future(factory())
+                call.add_done_callback(lambda done: self._forget(key, self._acalls, done))
+                self.leaders += 1
+                if key not in self._acalls:
+                    self._acalls[key] = call
+
+        return await asyncio.shield(call)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls) + len(self._acalls),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "overflow": self.overflow,
+            }
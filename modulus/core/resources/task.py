@@ -1,57 +1,251 @@
+import asyncio
+import contextvars
 import json
 
-from modulus.core.resources.agent import Agent
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable
+
+from modulus.core.resources.agent import Agent, retrieval_query
+from modulus.core.resources.cache import make_key
+from modulus.core.resources.single_flight import SingleFlight
+from modulus.core.stages import stage
+from modulus.core.tracing import start_span
+from modulus.core.util import find_cycle
 
 
 class Task:
     def __init__(self, name: str, flow: list[Agent], input_schema: dict, output_schema: dict,
-                 output_intermediate: bool):
+                 output_intermediate: bool, depends_on: dict[str, list[str]] = None,
+                 coalesce: SingleFlight = None, coalesce_key: Callable[[Any], Any] = None):
         self.name = name
         self.flow = flow
         self.input_schema = input_schema
         self.output_schema = output_schema
         self.output_intermediate = output_intermediate
+        self.parallel = depends_on is not None
+        self.dependencies = self._resolve_dependencies(depends_on)
+        self.order = self._topological_order()
+        self.coalesce = coalesce
+        self.coalesce_key = coalesce_key
 
-    def start(self, input_text: str) -> str:
-        current_text = input_text
-        num_agents = len(self.flow)
+    def _resolve_dependencies(self, depends_on: dict[str, list[str]]) -> list[list[int]]:
+        """
+        Return, for each agent of the flow, the flow indices of the agents whose output it consumes.
+
+        Without `depends_on` the flow is a chain where every agent consumes the previous one.
+        With it, agents are addressed by name and agents not listed only consume the original input.
+        """
+        if depends_on is None:
+            return [[i - 1] if i > 0 else [] for i in range(len(self.flow))]
+
+        indices = {agent.name: i for i, agent in enumerate(self.flow)}
+        if len(indices) != len(self.flow):
+            raise ValueError(f"Task {self.name} uses depends_on, so its flow cannot repeat agents")
+
+        for agent_name, upstream in depends_on.items():
+            for name in [agent_name, *upstream]:
+                if name not in indices:
+                    raise ValueError(f"Task {self.name} depends_on references agent '{name}' not in its flow")
 
-        return_text = ""
+        cycle = find_cycle({name: list(upstream) for name, upstream in depends_on.items()})
+        if cycle:
+            raise ValueError(f"Task {self.name} has a dependency cycle: {' -> '.join(cycle)}")
 
-        for i, agent in enumerate(self.flow):
-            if i == 0:
-                current_text = agent.message(input_text)
+        final = self.flow[-1].name
+        if any(final in upstream for upstream in depends_on.values()):
+            raise ValueError(f"Task {self.name} final agent '{final}' cannot be a dependency of other agents")
 
-            elif i == num_agents - 1:
-                full_text = {
-                    "previous_agent_output": current_text,
-                    "original_input": input_text
-                }
+        # Only the final agent's output is returned, so every other agent must feed into it
+        consumed = {name for upstream in depends_on.values() for name in upstream}
+        unused = [agent.name for agent in self.flow[:-1] if agent.name not in consumed]
+        if unused:
+            raise ValueError(f"Task {self.name} agent '{unused[0]}' has no downstream agent consuming its output")
+        if len(self.flow) > 1 and not depends_on.get(final):
+            raise ValueError(f"Task {self.name} final agent '{final}' must depend on other agents")
 
-                if self.output_schema:
-                    schema_str = json.dumps(self.output_schema, indent=2)
-                    injected_prompt = (
-                        f"Please structure your output to match the following schema:\n{schema_str}"
-                    )
-                else:
-                    injected_prompt = ""
+        return [[indices[name] for name in depends_on.get(agent.name, [])] for agent in self.flow]
 
-                current_text = agent.message(json.dumps(full_text), injected_prompt=injected_prompt)
+    def _topological_order(self) -> list[int]:
+        order, placed = [], set()
+        while len(order) < len(self.flow):
+            for i, upstream in enumerate(self.dependencies):
+                if i not in placed and all(j in placed for j in upstream):
+                    order.append(i)
+                    placed.add(i)
+        return order
 
+    def _agent_input(self, i: int, input_text: str, outputs: dict[int, str]) -> tuple[str, str]:
+        """
+        Return the (input, injected_prompt) pair for the i-th agent of the flow.
+        """
+        upstream = self.dependencies[i]
+        if not upstream:
+            return input_text, None
+
+        if len(upstream) == 1:
+            full_text = {
+                "previous_agent_output": outputs[upstream[0]],
+                "original_input": input_text
+            }
+        else:
+            full_text = {
+                "upstream_outputs": {self.flow[j].name: outputs[j] for j in upstream},
+                "original_input": input_text
+            }
+
+        injected_prompt = None
+        if i == len(self.flow) - 1:
+            if self.output_schema:
+                schema_str = json.dumps(self.output_schema, indent=2)
+                injected_prompt = (
+                    f"Please structure your output to match the following schema:\n{schema_str}"
+                )
             else:
-                full_text = {
-                    "previous_agent_output": current_text,
-                    "original_input": input_text
-                }
-                current_text = agent.message(json.dumps(full_text))
-
-            if self.output_intermediate:
-                return_text += f"AGENT: {agent.name}\n"
-                return_text += f"MODEL: {agent.llm.get_model()}\n\n"
-                return_text += current_text
-                return_text += "\n\n"
+                injected_prompt = ""
+
+        return json.dumps(full_text), injected_prompt
 
+    def _format_intermediate(self, agent: Agent, text: str) -> str:
+        return_text = f"AGENT: {agent.name}\n"
+        return_text += f"MODEL: {agent.llm.get_model()}\n\n"
+        return_text += text
+        return_text += "\n\n"
+        return return_text
+
+    def _format_result(self, outputs: dict[int, str]) -> str:
         if self.output_intermediate:
-            return return_text
+            return "".join(self._format_intermediate(agent, outputs[i]) for i, agent in enumerate(self.flow))
+
+        return outputs[len(self.flow) - 1]
+
+    # Retrieval for every agent with memory starts with the flow, from the original input, so it
+    # overlaps the upstream agents instead of running between them and the agent's LLM call
+    def _prefetch(self, input_text: Any) -> dict[int, Future]:
+        return {i: agent.prefetch(retrieval_query(input_text))
+                for i, agent in enumerate(self.flow) if agent.memory is not None}
+
+    def _aprefetch(self, input_text: Any) -> dict[int, asyncio.Task]:
+        return {i: asyncio.ensure_future(agent.aretrieve(retrieval_query(input_text)))
+                for i, agent in enumerate(self.flow) if agent.memory is not None}
+
+    def _schedule(self, input_text: str, outputs: dict[int, str], nodes: list[int],
+                  contexts: dict[int, asyncio.Task]) -> dict[int, asyncio.Task]:
+        """
+        Start one asyncio task per node; each waits for its upstream nodes before messaging its agent,
+        so independent branches run concurrently. Upstream nodes must be included in `nodes`.
+        """
+        scheduled = {}
+
+        async def run_node(i: int) -> int:
+            await asyncio.gather(*(scheduled[j] for j in self.dependencies[i]))
+            context = await contexts[i] if i in contexts else None
+            with stage("agent"):
+                agent_input, injected_prompt = self._agent_input(i, input_text, outputs)
+                outputs[i] = await self.flow[i].amessage(agent_input, injected_prompt=injected_prompt,
+                                                         context=context)
+            return i
+
+        for i in nodes:
+            scheduled[i] = asyncio.ensure_future(run_node(i))
+
+        return scheduled
+
+    def _coalesce_key(self, input_text: Any) -> str:
+        # Identical inputs (equal JSON regardless of key order) share one flow execution
+        if self.coalesce_key is not None:
+            return make_key(self.name, self.coalesce_key(input_text))
+        return make_key(self.name, input_text)
+
+    def start(self, input_text: str) -> str:
+        with start_span(f"task {self.name}", **{"task.name": self.name}):
+            if self.coalesce is not None:
+                return self.coalesce.run(self._coalesce_key(input_text), lambda: self._run(input_text))
+            return self._run(input_text)
+
+    async def astart(self, input_text: str) -> str:
+        with start_span(f"task {self.name}", **{"task.name": self.name}):
+            if self.coalesce is not None:
+                return await self.coalesce.arun(self._coalesce_key(input_text), lambda: self._arun(input_text))
+            return await self._arun(input_text)
+
+    def _run(self, input_text: str) -> str:
+        outputs = {}
+        contexts = self._prefetch(input_text)
+
+        if not self.parallel:
+            for i, agent in enumerate(self.flow):
+                context = contexts[i].result() if i in contexts else None
+                with stage("agent"):
+                    agent_input, injected_prompt = self._agent_input(i, input_text, outputs)
+                    outputs[i] = agent.message(agent_input, injected_prompt=injected_prompt, context=context)
+
+            return self._format_result(outputs)
+
+        # Every node gets its own worker so a node waiting on its upstream never starves them
+        with ThreadPoolExecutor(max_workers=len(self.flow)) as pool:
+            futures = {}
+
+            def run_node(i: int) -> None:
+                for j in self.dependencies[i]:
+                    futures[j].result()
+                context = contexts[i].result() if i in contexts else None
+                agent_input, injected_prompt = self._agent_input(i, input_text, outputs)
+                outputs[i] = self.flow[i].message(agent_input, injected_prompt=injected_prompt, context=context)
+
+            # Workers run in a copy of this context so their spans and stages belong to this request
+            for i in self.order:
+                futures[i] = pool.submit(contextvars.copy_context().run, run_node, i)
+
+            for future in futures.values():
+                future.result()
+
+        return self._format_result(outputs)
+
+    async def _arun(self, input_text: str) -> str:
+        outputs = {}
+        contexts = self._aprefetch(input_text)
+        scheduled = self._schedule(input_text, outputs, list(range(len(self.flow))), contexts)
+
+        try:
+            await asyncio.gather(*scheduled.values())
+        finally:
+            for pending in [*scheduled.values(), *contexts.values()]:
+                pending.cancel()
+
+        return self._format_result(outputs)
+
+    async def astream(self, input_text: str) -> AsyncIterator[dict]:
+        """
+        Run the flow, yielding events as they happen:
+
+        - {"event": "agent", "agent": ..., "model": ..., "data": ...} once per intermediate
+          agent as it completes, only when output_intermediate is set
+        - {"event": "token", "agent": ..., "data": ...} for each chunk of the final agent's output
+        - {"event": "done", "agent": ...} when the final agent finishes
+        """
+        outputs = {}
+        last = len(self.flow) - 1
+        contexts = self._aprefetch(input_text)
+        scheduled = self._schedule(input_text, outputs, list(range(last)), contexts)
+
+        try:
+            for completed in asyncio.as_completed(list(scheduled.values())):
+                i = await completed
+
+                if self.output_intermediate:
+                    agent = self.flow[i]
+                    yield {"event": "agent", "agent": agent.name, "model": agent.llm.get_model(),
+                           "data": outputs[i]}
+
+            context = await contexts[last] if last in contexts else None
+        finally:
+            for pending in [*scheduled.values(), *contexts.values()]:
+                pending.cancel()
+
+        agent = self.flow[last]
+        agent_input, injected_prompt = self._agent_input(last, input_text, outputs)
+
+        async for token in agent.astream(agent_input, injected_prompt=injected_prompt, context=context):
+            yield {"event": "token", "agent": agent.name, "data": token}
 
-        return current_text
+        yield {"event": "done", "agent": agent.name}
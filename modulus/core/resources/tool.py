@@ -1,5 +1,23 @@
+import asyncio
+import contextvars
+import inspect
+import string
+import threading
+import types
+import typing
+
 from abc import ABC, abstractmethod
-from typing import Callable
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, List, Optional
+from urllib.parse import quote
+
+import httpx
+
+from modulus.core.resources.api_client import ApiClient, ApiError, CircuitBreaker, CircuitOpenError
+from modulus.core.resources.cache import Cache, MemoryCache, MISS, make_key
+from modulus.core.resources.memory import Memory
+from modulus.core.resources.process_pool import ToolProcessPool
+from modulus.core.tracing import current_span, start_span
 
 
 def function(description: str):
@@ -8,19 +26,438 @@ def function(description: str):
         return fn
     return decorator
 
+
+# X | None annotations (Python 3.10+)
+UNION_TYPES = (typing.Union, getattr(types, "UnionType", typing.Union))
+JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean", list: "array", dict: "object"}
+
+
+def _json_schema(annotation) -> dict:
+    # Optional[X] / X | None describe X; unknown annotations accept any value
+    if typing.get_origin(annotation) in UNION_TYPES:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        annotation = args[0] if len(args) == 1 else None
+
+    json_type = JSON_TYPES.get(typing.get_origin(annotation) or annotation)
+    return {"type": json_type} if json_type else {}
+
+
+def function_parameters(fn: Callable) -> dict:
+    """
+    JSON schema of a function's keyword arguments, derived from its signature and type hints.
+    """
+    try:
+        hints = typing.get_type_hints(fn)
+    except Exception:
+        hints = {}
+
+    properties, required = {}, []
+    for name, parameter in inspect.signature(fn).parameters.items():
+        if parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            continue
+
+        properties[name] = _json_schema(hints.get(name))
+        if parameter.default is parameter.empty:
+            required.append(name)
+
+    return {"type": "object", "properties": properties, "required": required}
+
+
 class Tool(ABC):
-    def __init__(self, name: str):
+    def __init__(self, name: str, description: str = ""):
         self.name = name
+        self.description = description
+        # JSON schema of the arguments passed to `run`
+        self.parameters = {"type": "object", "properties": {}}
+
+    def spec(self) -> dict:
+        """Definition sent to the LLM for function calling."""
+        return {"name": self.name, "description": self.description, "parameters": self.parameters}
 
     @abstractmethod
-    def run(self, kwargs: dict[str, str]) -> str:
+    def run(self, kwargs: dict[str, Any]) -> Any:
         pass
 
+    async def arun(self, kwargs: dict[str, Any]) -> Any:
+        """Run the tool without blocking the event loop (on a worker thread by default)."""
+        return await asyncio.to_thread(self.run, kwargs)
+
 
 class Function(Tool):
-    def __init__(self, name: str, fn: Callable):
-        super().__init__(name)
+    """
+    A Python function exposed as a tool. `executor` decides where calls run:
+
+    - "inline": on the calling thread, including the event loop for async agents (for trivial functions)
+    - "thread" (default): async agents run it on a worker thread; with a `timeout` the caller stops waiting
+      after that many seconds, but the thread itself cannot be stopped
+    - "process": in `pool`, a ToolProcessPool, out of the server's GIL with a hard `timeout`
+      and `memory_limit_mb`. `function_path` is the path the workers load the function from.
+    """
+
+    EXECUTORS = ("inline", "thread", "process")
+
+    def __init__(self, name: str, fn: Callable, executor: str = "thread", timeout: float = None,
+                 memory_limit_mb: int = None, pool: ToolProcessPool = None, function_path: str = None):
+        super().__init__(name, getattr(fn, "_tool_description", None) or inspect.getdoc(fn) or "")
         self.fn = fn
+        self.parameters = function_parameters(fn)
+        self.executor = executor
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.pool = pool
+        self.function_path = function_path
+        self._threads = None
+
+        if executor not in self.EXECUTORS:
+            raise ValueError(f"Tool {name} executor `{executor}` is not supported")
+        if executor == "process" and (pool is None or function_path is None):
+            raise ValueError(f"Tool {name} runs in a process pool, which requires the pool and function path")
+
+    def _span(self):
+        return start_span(f"tool {self.name}", **{"tool.name": self.name, "tool.executor": self.executor})
+
+    def _timed_out(self) -> TimeoutError:
+        return TimeoutError(f"Tool {self.name} exceeded {self.timeout}s")
+
+    def run(self, kwargs: dict[str, Any]) -> Any:
+        with self._span():
+            if self.executor == "process":
+                return self.pool.run(self.function_path, kwargs, self.timeout, self.memory_limit_mb)
+
+            if self.executor == "thread" and self.timeout is not None:
+                if self._threads is None:
+                    self._threads = ThreadPoolExecutor(thread_name_prefix=f"modulus-tool-{self.name}")
+                future = self._threads.submit(contextvars.copy_context().run, self.fn, **kwargs)
+                try:
+                    return future.result(self.timeout)
+                except FutureTimeoutError:
+                    raise self._timed_out() from None
+
+            return self.fn(**kwargs)
+
+    async def arun(self, kwargs: dict[str, Any]) -> Any:
+        if self.executor == "inline":
+            return self.run(kwargs)
+
+        with self._span():
+            if self.executor == "process":
+                return await self.pool.arun(self.function_path, kwargs, self.timeout, self.memory_limit_mb)
+
+            try:
+                return await asyncio.wait_for(asyncio.to_thread(self.fn, **kwargs), self.timeout)
+            except asyncio.TimeoutError:
+                raise self._timed_out() from None
+
+
+class VectorLookup(Tool):
+    """
+    Search a memory store with a query written by the model. Returns up to `k` passages scoring at
+    least `min_score` whose metadata matches `filters` (see Memory.search).
+    """
+
+    def __init__(self, name: str, memory: Memory, description: str = None, k: int = 5,
+                 min_score: Optional[float] = None, filters: Optional[dict] = None):
+        super().__init__(name, description or "Search the knowledge base for passages relevant to a query")
+        self.memory = memory
+        self.k = k
+        self.min_score = min_score
+        self.filters = filters
+        self.parameters = {
+            "type": "object",
+            "properties": {"query": {"type": "string", "description": "What to search for"}},
+            "required": ["query"],
+        }
+
+    def run(self, kwargs: dict[str, Any]) -> Any:
+        with start_span(f"tool {self.name}", **{"tool.name": self.name}):
+            return self.memory.search(kwargs["query"], self.k, self.min_score, self.filters)
+
+
+class ApiEndpoint(Tool):
+    """
+    An HTTP endpoint exposed as a tool. The `{placeholders}` of the `url` template are filled from
+    the tool arguments; the other arguments, declared in `parameters` as {name: JSON type}, are sent
+    in the query string of GET and DELETE requests and as the JSON body otherwise.
+
+    - Requests go through `client`, whose connection pools are shared by all API tools.
+    - With `fan_out`, that argument is a list and one request per element is sent concurrently;
+      the result lists the responses in order, with {"error": ...} for failed requests.
+    - GET responses carrying an ETag or Last-Modified are kept (up to `conditional_cache_size`) and
+      revalidated with If-None-Match / If-Modified-Since; a 304 answer returns the kept response.
+    - `breaker` fails requests immediately while the endpoint keeps failing (see CircuitBreaker).
+    """
+
+    METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+
+    def __init__(self, name: str, url: str, client: ApiClient, method: str = "GET", headers: dict = None,
+                 timeout: float = None, parameters: dict = None, description: str = None, fan_out: str = None,
+                 breaker: CircuitBreaker = None, conditional_cache_size: int = 1024):
+        super().__init__(name, description or f"{method.upper()} {url}")
+        self.url = url
+        self.client = client
+        self.method = method.upper()
+        self.headers = headers or {}
+        self.timeout = timeout
+        self.fan_out = fan_out
+        self.breaker = breaker or CircuitBreaker()
+        self._responses = MemoryCache(conditional_cache_size) if conditional_cache_size else None
+        self._threads = None
+        self._stats_lock = threading.Lock()
+        self.counts = {"ok": 0, "not_modified": 0, "failed": 0, "rejected": 0}
+
+        if self.method not in self.METHODS:
+            raise ValueError(f"Tool {name} method `{method}` is not supported")
+
+        self.placeholders = [field for _, field, _, _ in string.Formatter().parse(url) if field]
+        properties = {placeholder: {"type": "string"} for placeholder in self.placeholders}
+        properties.update({parameter: {"type": json_type} for parameter, json_type in (parameters or {}).items()})
+        required = list(self.placeholders)
+
+        if fan_out is not None:
+            if fan_out not in properties:
+                raise ValueError(f"Tool {name} fans out over unknown argument `{fan_out}`")
+            properties[fan_out] = {"type": "array", "items": properties[fan_out]}
+            required = list(dict.fromkeys([*required, fan_out]))
+
+        self.parameters = {"type": "object", "properties": properties, "required": required}
+
+    def _span(self):
+        return start_span(f"tool {self.name}", **{"tool.name": self.name, "http.method": self.method})
+
+    def _count(self, outcome: str):
+        with self._stats_lock:
+            self.counts[outcome] += 1
+
+    def _request(self, kwargs: dict[str, Any]) -> tuple[dict, Optional[str], Any]:
+        """Return the request's httpx arguments, its revalidation key, and the kept response to revalidate."""
+        missing = [placeholder for placeholder in self.placeholders if placeholder not in kwargs]
+        if missing:
+            raise ValueError(f"Missing arguments: {', '.join(missing)}")
+
+        url = self.url.format(**{placeholder: quote(str(kwargs[placeholder]), safe="")
+                                 for placeholder in self.placeholders})
+        rest = {key: value for key, value in kwargs.items() if key not in self.placeholders}
+        request = {"method": self.method, "url": url, "headers": dict(self.headers)}
+        if self.timeout is not None:
+            request["timeout"] = self.timeout
+        if self.method in ("GET", "DELETE"):
+            request["params"] = rest
+        elif rest:
+            request["json"] = rest
+
+        key, kept = None, None
+        if self.method == "GET" and self._responses is not None:
+            key = make_key(url, rest)
+            kept = self._responses.get(key)
+            if kept is MISS:
+                kept = None
+            elif kept["etag"]:
+                request["headers"]["If-None-Match"] = kept["etag"]
+            else:
+                request["headers"]["If-Modified-Since"] = kept["last_modified"]
+
+        return request, key, kept
+
+    def _admit(self):
+        try:
+            self.breaker.allow()
+        except CircuitOpenError:
+            self._count("rejected")
+            raise
+
+    def _failed(self):
+        # Only the endpoint being unreachable or broken trips the breaker, not bad requests
+        self.breaker.record_failure()
+        self._count("failed")
+
+    def _result(self, response: httpx.Response, key: Optional[str], kept: Any) -> Any:
+        current_span().set_attribute("http.status_code", response.status_code)
+
+        if response.status_code == 304 and kept is not None:
+            self.breaker.record_success()
+            self._count("not_modified")
+            return kept["result"]
+
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+
+        if response.status_code >= 400:
+            self._count("failed")
+            raise ApiError(f"{self.method} {response.request.url} returned {response.status_code}: "
+                           f"{response.text[:500]}", response.status_code)
+
+        if "json" in response.headers.get("content-type", ""):
+            result = response.json()
+        else:
+            result = response.text
+
+        etag, last_modified = response.headers.get("etag"), response.headers.get("last-modified")
+        if key is not None and (etag or last_modified):
+            self._responses.set(key, {"etag": etag, "last_modified": last_modified, "result": result})
+
+        self._count("ok")
+        return result
+
+    def _call(self, kwargs: dict[str, Any]) -> Any:
+        request, key, kept = self._request(kwargs)
+        self._admit()
+        try:
+            response = self.client.get_client().request(**request)
+        except httpx.TransportError:
+            self._failed()
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        return self._result(response, key, kept)
+
+    async def _acall(self, kwargs: dict[str, Any]) -> Any:
+        request, key, kept = self._request(kwargs)
+        self._admit()
+        try:
+            response = await self.client.get_async_client().request(**request)
+        except httpx.TransportError:
+            self._failed()
+            raise
+        except BaseException:
+            # Cancelled, e.g. the client went away; says nothing about the endpoint
+            self.breaker.release()
+            raise
+        return self._result(response, key, kept)
+
+    def _fan_out_calls(self, kwargs: dict[str, Any]) -> list[dict[str, Any]]:
+        values = kwargs.get(self.fan_out)
+        if not isinstance(values, list):
+            raise ValueError(f"Argument `{self.fan_out}` must be a list")
+        return [{**kwargs, self.fan_out: value} for value in values]
+
+    # Failed fan-out requests are reported in place, so the others' results still reach the model
+    def _fan_out_call(self, kwargs: dict[str, Any]) -> Any:
+        try:
+            return self._call(kwargs)
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+
+    async def _afan_out_call(self, kwargs: dict[str, Any]) -> Any:
+        try:
+            return await self._acall(kwargs)
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+
+    def run(self, kwargs: dict[str, Any]) -> Any:
+        with self._span():
+            if self.fan_out is None:
+                return self._call(kwargs)
+
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(thread_name_prefix=f"modulus-tool-{self.name}")
+            futures = [self._threads.submit(contextvars.copy_context().run, self._fan_out_call, call)
+                       for call in self._fan_out_calls(kwargs)]
+            return [future.result() for future in futures]
+
+    async def arun(self, kwargs: dict[str, Any]) -> Any:
+        with self._span():
+            if self.fan_out is None:
+                return await self._acall(kwargs)
+
+            return list(await asyncio.gather(*(self._afan_out_call(call) for call in self._fan_out_calls(kwargs))))
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return dict(self.counts)
+
+
+class CachedTool(Tool):
+    """
+    Memoize a deterministic tool: calls with the same arguments (compared as normalized JSON)
+    return the stored result instead of running it again. Errors are not cached.
+
+    `caches` are tiers checked in order (e.g. an in-memory LRU, then a DiskCache); a hit in a
+    later tier is promoted into the earlier ones for the rest of its lifetime.
+    """
+
+    def __init__(self, tool: Tool, caches: List[Cache]):
+        super().__init__(tool.name, tool.description)
+        self.tool = tool
+        self.parameters = tool.parameters
+        self.caches = caches
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def _key(self, kwargs: dict[str, Any]) -> str:
+        # The function path keeps persistent entries from outliving a tool that now calls something else
+        return make_key(self.name, getattr(self.tool, "function_path", None), kwargs)
+
+    # On a miss the wrapped tool opens its own `tool <name>` span inside this one
+    def _span(self):
+        return start_span(f"tool.cache {self.name}", **{"tool.name": self.name})
+
+    def _record(self, result: Any) -> Any:
+        with self._stats_lock:
+            if result is MISS:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        current_span().set_attribute("tool.cache_hit", result is not MISS)
+        return result
+
+    # Promoted entries keep their remaining ttl, so a hit is never served past the original expiry
+    def _lookup(self, key: str) -> Any:
+        result = MISS
+        for i, cache in enumerate(self.caches):
+            result, expires_in = cache.get_entry(key)
+            if result is not MISS:
+                for earlier in self.caches[:i]:
+                    earlier.set(key, result, expires_in)
+                break
+
+        return self._record(result)
+
+    async def _alookup(self, key: str) -> Any:
+        result = MISS
+        for i, cache in enumerate(self.caches):
+            result, expires_in = await cache.aget_entry(key)
+            if result is not MISS:
+                for earlier in self.caches[:i]:
+                    await earlier.aset(key, result, expires_in)
+                break
+
+        return self._record(result)
+
+    def run(self, kwargs: dict[str, Any]) -> Any:
+        key = self._key(kwargs)
+
+        with self._span():
+            result = self._lookup(key)
+            if result is MISS:
+                result = self.tool.run(kwargs)
+                for cache in self.caches:
+                    cache.set(key, result)
+
+        return result
+
+    async def arun(self, kwargs: dict[str, Any]) -> Any:
+        key = self._key(kwargs)
+
+        with self._span():
+            result = await self._alookup(key)
+            if result is MISS:
+                result = await self.tool.arun(kwargs)
+                for cache in self.caches:
+                    await cache.aset(key, result)
+
+        return result
 
-    def run(self, kwargs: dict[str, str]) -> str:
-        return self.fn(*kwargs)
+    def stats(self) -> dict:
+        with self._stats_lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+                "tiers": [cache.stats() for cache in self.caches],
+            }
@@ -0,0 +1,52 @@
+import time
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+
+# Seconds spent per stage by the current request; None outside a request that collects stages
+_stages: ContextVar[Optional[dict]] = ContextVar("modulus_stages", default=None)
+
+
+def collect_stages() -> dict:
+    """
+    Start collecting stage durations for the current request (and tasks it spawns) into the returned dict.
+    """
+    stages = {}
+    _stages.set(stages)
+    return stages
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Add the time spent in the block to `name`. Durations accumulate, so concurrent agents of a
+    DAG flow add up to more than the wall time.
+    """
+    stages = _stages.get()
+    if stages is None:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = stages.get(name, 0.0) + time.perf_counter() - started
+
+
+def server_timing(stages: dict) -> str:
+    """
+    Format stages as a Server-Timing header value (durations in milliseconds).
+    """
+    return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in stages.items())
+
+
+def parse_server_timing(header: str) -> dict:
+    stages = {}
+    for entry in header.split(","):
+        name, _, duration = entry.strip().partition(";dur=")
+        if name and duration:
+            stages[name] = float(duration) / 1000
+    return stages
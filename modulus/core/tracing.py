@@ -0,0 +1,262 @@
+import atexit
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+
+
+class Span:
+    """
+    A timed operation within a trace. Spans started while another span is current become its children.
+    """
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], kind: str, attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.error = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def add_to_attribute(self, key: str, value: float):
+        self.attributes[key] = self.attributes.get(key, 0) + value
+
+    def record_exception(self, error: BaseException):
+        self.error = f"{type(error).__name__}: {error}"
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Stands in for a span while tracing is disabled, so instrumented code needs no checks."""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def add_to_attribute(self, key: str, value: float):
+        pass
+
+    def record_exception(self, error: BaseException):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter(ABC):
+    @abstractmethod
+    def export(self, span: Span) -> None:
+        """Called once per span when it ends. Must be thread-safe and should not block for long."""
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class ConsoleExporter(SpanExporter):
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stderr
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        attributes = " ".join(f"{k}={v}" for k, v in span.attributes.items())
+        status = f" error={span.error!r}" if span.error else ""
+        with self._lock:
+            print(f"[trace {span.trace_id[:8]}] {span.name} {(span.end_ns - span.start_ns) / 1e6:.1f}ms "
+                  f"{attributes}{status}", file=self.stream)
+
+
+class FileExporter(SpanExporter):
+    """
+    Append spans as JSON lines to `path`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OTLPExporter(SpanExporter):
+    """
+    Send spans to an OpenTelemetry collector with OTLP/HTTP JSON (`<endpoint>/v1/traces`).
+    Spans are queued and sent in batches by a background thread, so exporting never blocks requests;
+    when the queue is full new spans are dropped.
+    """
+
+    KINDS = {"internal": 1, "server": 2, "client": 3}
+
+    def __init__(self, endpoint: str = "http://localhost:4318", service_name: str = "modulus",
+                 headers: dict = None, batch_size: int = 512, interval: float = 2.0, max_queue: int = 8192):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.service_name = service_name
+        self.headers = headers or {}
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_queue = max_queue
+        self.dropped = 0
+
+        self._queue = []
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="modulus-otlp-exporter", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        with self._condition:
+            if len(self._queue) >= self.max_queue:
+                self.dropped += 1
+                return
+            self._queue.append(span)
+            if len(self._queue) >= self.batch_size:
+                self._condition.notify()
+
+    def _encode(self, spans: list[Span]) -> dict:
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "modulus"},
+                "spans": [{
+                    "traceId": span.trace_id,
+                    "spanId": span.span_id,
+                    "parentSpanId": span.parent_id or "",
+                    "name": span.name,
+                    "kind": self.KINDS.get(span.kind, 1),
+                    "startTimeUnixNano": str(span.start_ns),
+                    "endTimeUnixNano": str(span.end_ns),
+                    "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+                    "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+                } for span in spans],
+            }],
+        }]}
+
+    def _send(self, spans: list[Span]):
+        import httpx
+
+        try:
+            httpx.post(self.url, json=self._encode(spans), headers=self.headers, timeout=10.0)
+        except httpx.HTTPError:
+            # Tracing must never take the service down; a collector outage only loses spans
+            self.dropped += len(spans)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self._stopped and len(self._queue) < self.batch_size:
+                    self._condition.wait(self.interval)
+                batch, self._queue = self._queue, []
+                stopped = self._stopped
+
+            for start in range(0, len(batch), self.batch_size):
+                self._send(batch[start:start + self.batch_size])
+
+            if stopped:
+                return
+
+    def shutdown(self) -> None:
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        self._thread.join(timeout=10.0)
+
+
+_exporter: Optional[SpanExporter] = None
+_current: ContextVar[Optional[Span]] = ContextVar("modulus_span", default=None)
+
+
+def configure_tracing(exporter: Optional[SpanExporter]):
+    """
+    Send spans to `exporter` from now on, or disable tracing with None.
+    """
+    global _exporter
+    previous, _exporter = _exporter, exporter
+
+    if previous is not None:
+        previous.shutdown()
+    elif exporter is not None:
+        # Flush queued spans when the process (or a server worker) exits
+        atexit.register(configure_tracing, None)
+
+
+def tracing_enabled() -> bool:
+    return _exporter is not None
+
+
+def current_span():
+    """
+    The innermost active span, for annotating it with attributes (a no-op span when there is none).
+    """
+    span = _current.get()
+    return span if span is not None else NOOP_SPAN
+
+
+@contextmanager
+def start_span(name: str, kind: str = "internal", **attributes):
+    """
+    Run the block inside a new span, child of the current one. Exceptions are recorded on the span
+    and re-raised. Yields a no-op span when tracing is disabled.
+    """
+    exporter = _exporter
+    if exporter is None:
+        yield NOOP_SPAN
+        return
+
+    parent = _current.get()
+    span = Span(name, parent.trace_id if parent else secrets.token_hex(16), parent.span_id if parent else None,
+                kind, attributes)
+    token = _current.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.record_exception(e)
+        raise
+    finally:
+        _current.reset(token)
+        span.end_ns = time.time_ns()
+        exporter.export(span)
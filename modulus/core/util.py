@@ -1,4 +1,5 @@
 import os
+import importlib.util
 
 
 def flatten_resources(toml_data):
@@ -7,4 +8,87 @@ def flatten_resources(toml_data):
         if isinstance(resources, dict):
             for name, res in resources.items():
                 flat[(resource_type, name)] = res
-    return flat
\ No newline at end of file
+    return flat
+
+def find_cycle(graph: dict[str, list[str]]):
+    """
+    Return a list of nodes forming a cycle in `graph` (node -> upstream nodes), or None if acyclic.
+    """
+    visiting, done = set(), set()
+    path = []
+
+    def visit(node):
+        visiting.add(node)
+        path.append(node)
+        for upstream in graph.get(node, []):
+            if upstream in visiting:
+                return path[path.index(upstream):] + [upstream]
+            if upstream not in done:
+                cycle = visit(upstream)
+                if cycle:
+                    return cycle
+        visiting.discard(node)
+        done.add(node)
+        path.pop()
+        return None
+
+    for node in graph:
+        if node not in done:
+            cycle = visit(node)
+            if cycle:
+                return cycle
+
+    return None
+
+
+def resolve_value(value, config_data: dict):
+    """
+    Resolve `@var:<name>` and `@env:<name>` references in secret-bearing options (API keys, headers).
+    Returns None when the variable is not defined.
+    """
+    if isinstance(value, str) and value.startswith("@var:"):
+        vars_config = (config_data.get('vars') or {}).get('vars')
+        return vars_config.values.get(value[len("@var:"):], None) if vars_config is not None else None
+    if isinstance(value, str) and value.startswith("@env:"):
+        return os.environ.get(value[len("@env:"):], None)
+    return value
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap token estimate (~4 characters per token) used for budgeting before a request is sent.
+    """
+    return len(text) // 4 + 1
+
+
+def load_function(function_path: str):
+    """
+    Load a function given a path like 'functions/foo.foofn' relative to current working directory,
+    without requiring the directory to be in sys.path or a package.
+
+    - Splits to get module file path and function name.
+    - Loads module from file.
+    - Returns the function object.
+    """
+    # Separate the module path and function name
+    module_path_str, fn_name = function_path.rsplit('.', 1)
+    # Convert dots or slashes to filesystem path
+    module_path_parts = module_path_str.replace('.', '/').split('/')
+    # Build the .py file path relative to current working directory
+    module_file_path = os.path.join(*module_path_parts) + ".py"
+
+    if not os.path.isfile(module_file_path):
+        raise FileNotFoundError(f"Module file not found at: {module_file_path}")
+
+    # Create a unique module name for importlib
+    module_name = "_modulus_dynamic_module"
+
+    spec = importlib.util.spec_from_file_location(module_name, module_file_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)  # Load the module
+
+    fn = getattr(module, fn_name, None)
+    if fn is None:
+        raise AttributeError(f"Function '{fn_name}' not found in module '{module_file_path}'")
+
+    return fn
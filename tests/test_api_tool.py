@@ -0,0 +1,172 @@
+import asyncio
+import json
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from modulus.cli.commands.verify import verify_tool
+from modulus.core.models import ToolConfig
+from modulus.core.resources.api_client import ApiClient, ApiError, CircuitBreaker, CircuitOpenError
+from modulus.core.resources.tool import ApiEndpoint
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    /items/<id>: JSON with ETag "v1", 304 when revalidated; ids starting with "missing" are 404s
+    /flaky: answers with the status the test sets on the server
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", headers: dict = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+
+        if self.path.startswith("/items/"):
+            item_id = self.path[len("/items/"):].split("?")[0]
+            if item_id.startswith("missing"):
+                return self._send(404, b"not found")
+            if self.headers.get("If-None-Match") == '"v1"':
+                return self._send(304)
+            return self._send(200, json.dumps({"id": item_id}).encode(),
+                              {"Content-Type": "application/json", "ETag": '"v1"'})
+
+        if self.path.startswith("/flaky"):
+            return self._send(self.server.status, b"flaky")
+
+        return self._send(404)
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.requests = []
+    server.status = 200
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client():
+    return ApiClient()
+
+
+def test_revalidation_reuses_kept_result(stub, client):
+    tool = ApiEndpoint("items", stub.url + "/items/{item_id}", client)
+
+    assert tool.run({"item_id": "a"}) == {"id": "a"}
+    assert tool.run({"item_id": "a"}) == {"id": "a"}
+
+    assert stub.requests[1][1].get("If-None-Match") == '"v1"'
+    assert tool.stats()["ok"] == 1
+    assert tool.stats()["not_modified"] == 1
+
+
+def test_revalidation_async(stub, client):
+    tool = ApiEndpoint("items", stub.url + "/items/{item_id}", client)
+
+    async def run():
+        return [await tool.arun({"item_id": "b"}), await tool.arun({"item_id": "b"})]
+
+    assert asyncio.run(run()) == [{"id": "b"}, {"id": "b"}]
+    assert tool.stats()["not_modified"] == 1
+
+
+def test_fan_out_keeps_order_and_reports_errors(stub, client):
+    tool = ApiEndpoint("items", stub.url + "/items/{item_id}", client, fan_out="item_id")
+    ids = ["a", "missing-1", "c", "d/e"]
+
+    results = tool.run({"item_id": ids})
+
+    assert results[0] == {"id": "a"}
+    assert "404" in results[1]["error"]
+    assert results[2] == {"id": "c"}
+    # Path arguments are URL-encoded
+    assert results[3] == {"id": "d%2Fe"}
+
+    async_results = asyncio.run(ApiEndpoint("items", stub.url + "/items/{item_id}", client,
+                                            fan_out="item_id").arun({"item_id": ids}))
+    assert [result.get("id") for result in async_results] == ["a", None, "c", "d%2Fe"]
+
+
+def test_breaker_opens_probes_and_closes(stub, client):
+    tool = ApiEndpoint("flaky", stub.url + "/flaky", client, breaker=CircuitBreaker(2, cooldown=0.2))
+    stub.status = 503
+
+    for _ in range(2):
+        with pytest.raises(ApiError):
+            tool.run({})
+    assert tool.breaker.state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        tool.run({})
+    assert len(stub.requests) == 2
+
+    # A failed probe opens the circuit again
+    time.sleep(0.25)
+    with pytest.raises(ApiError):
+        tool.run({})
+    assert tool.breaker.state == "open"
+
+    # A successful probe closes it
+    time.sleep(0.25)
+    stub.status = 200
+    assert tool.run({}) == "flaky"
+    assert tool.breaker.state == "closed"
+    assert tool.stats() == {"ok": 1, "not_modified": 0, "failed": 3, "rejected": 1}
+
+
+def test_half_open_admits_a_single_probe():
+    breaker = CircuitBreaker(1, cooldown=0.0)
+    breaker.record_failure()
+
+    breaker.allow()
+    assert breaker.state == "half_open"
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+
+    # A probe that never got an answer lets the next request probe
+    breaker.release()
+    breaker.allow()
+    assert breaker.state == "half_open"
+
+
+def test_client_errors_do_not_trip_breaker(stub, client):
+    tool = ApiEndpoint("items", stub.url + "/items/{item_id}", client, breaker=CircuitBreaker(2))
+
+    for _ in range(4):
+        with pytest.raises(ApiError) as error:
+            tool.run({"item_id": "missing"})
+        assert error.value.status_code == 404
+
+    assert tool.breaker.state == "closed"
+
+
+def test_verify_resolves_header_references(monkeypatch):
+    config = {"memory": {}}
+    tool = ToolConfig("items", "api", {"url": "http://localhost/items/{item_id}",
+                                       "headers": {"Authorization": "@env:STUB_API_TOKEN"}})
+
+    monkeypatch.delenv("STUB_API_TOKEN", raising=False)
+    assert not verify_tool({"items": tool}, config)
+
+    monkeypatch.setenv("STUB_API_TOKEN", "Bearer token")
+    assert verify_tool({"items": tool}, config)
+
+    tool.params["headers"] = {"Authorization": "@var:missing"}
+    assert not verify_tool({"items": tool}, config)